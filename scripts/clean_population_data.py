@@ -14,11 +14,18 @@ Combines data from:
 
 Filters for rows where NAME ends with " city" (case sensitive).
 Outputs format similar to zillow_homeval_city.csv with City, State, yearly values, and YoY changes.
+
+The files are streamed: the encoding is detected once from a byte sample, only the
+SUMLEV/NAME/STNAME/POPESTIMATE columns are parsed, and rows are filtered chunk by
+chunk, so memory stays bounded for the full national sub-county files.
 """
 
-import pandas as pd
+import codecs
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
 # State abbreviation mapping
 STATE_ABBR = {
     "Alabama": "AL", "Alaska": "AK", "Arizona": "AZ", "Arkansas": "AR",
@@ -38,31 +45,88 @@ STATE_ABBR = {
 }
 
 
-def load_and_filter_cities(filepath: Path) -> pd.DataFrame:
-    """Load CSV and filter for rows where NAME ends with ' city'.
+# Years taken from each file; where files overlap the later vintage wins
+SOURCES = {
+    "sub-est00int.csv": range(2000, 2010),
+    "sub-est2020int.csv": range(2010, 2020),
+    "sub-est2024.csv": range(2020, 2025),
+}
+ENCODINGS = ["utf-8", "latin-1"]
+SAMPLE_BYTES = 1 << 20
+CHUNK_ROWS = 100_000
+CITY_SUFFIX = " city"
 
-    Filters for SUMLEV 162 (incorporated places) to avoid duplicate entries
-    from county subdivisions within places (SUMLEV 157).
-    """
-    # Try different encodings
-    for encoding in ["utf-8", "latin-1", "cp1252"]:
+
+def detect_encoding(filepath: Path, sample_bytes: int = SAMPLE_BYTES) -> str:
+    """First encoding in ENCODINGS that decodes a sample from the start of the file."""
+    with open(filepath, "rb") as f:
+        sample = f.read(sample_bytes)
+    for encoding in ENCODINGS:
         try:
-            df = pd.read_csv(filepath, encoding=encoding)
-            break
+            # Incremental decode tolerates a multi-byte character cut at the sample end
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding
         except UnicodeDecodeError:
             continue
-    # Filter for:
-    # - SUMLEV 162 (incorporated places) to get city-level totals only
-    # - Names ending with " city" (case sensitive)
-    mask = (df["SUMLEV"] == 162) & (df["NAME"].str.endswith(" city"))
-    return df[mask].copy()
+    return ENCODINGS[-1]
 
 
-def extract_city_name(name: str) -> str:
-    """Extract city name by removing ' city' suffix."""
-    if name.endswith(" city"):
-        return name[:-5]  # Remove " city"
-    return name
+def load_and_filter_cities(filepath: Path, years=None, chunksize: int = CHUNK_ROWS) -> pd.DataFrame:
+    """Load CSV and filter for rows where NAME ends with ' city'.
+
+    Filters for SUMLEV 162 (incorporated places) to avoid duplicate entries
+    from county subdivisions within places (SUMLEV 157).
+    Only NAME, STNAME and the POPESTIMATE columns (those for `years`, or all) are kept.
+    """
+    wanted = None if years is None else {f"POPESTIMATE{y}" for y in years}
+
+    def use_column(col: str) -> bool:
+        if col in ("SUMLEV", "NAME", "STNAME"):
+            return True
+        return col.startswith("POPESTIMATE") and (wanted is None or col in wanted)
+
+    def read(encoding: str) -> pd.DataFrame:
+        chunks = []
+        reader = pd.read_csv(
+            filepath, encoding=encoding, usecols=use_column, chunksize=chunksize,
+            dtype={"NAME": str, "STNAME": str},
+        )
+        for chunk in reader:
+            # Filter for:
+            # - SUMLEV 162 (incorporated places) to get city-level totals only
+            # - Names ending with " city" (case sensitive)
+            mask = (chunk["SUMLEV"] == 162) & chunk["NAME"].str.endswith(CITY_SUFFIX)
+            chunks.append(chunk.loc[mask].drop(columns="SUMLEV"))
+        return pd.concat(chunks, ignore_index=True)
+
+    encoding = detect_encoding(filepath)
+    try:
+        return read(encoding)
+    except UnicodeDecodeError:
+        # A non-UTF-8 byte past the sample; latin-1 decodes any byte
+        return read(ENCODINGS[-1])
+
+
+def to_city_frame(df: pd.DataFrame, years) -> pd.DataFrame:
+    """City, State and one column per year ("2000", ...) from a filtered estimates file."""
+    out = pd.DataFrame({
+        "City": df["NAME"].str.slice(stop=-len(CITY_SUFFIX)),
+        "State": df["STNAME"].map(STATE_ABBR),
+    })
+    for year in years:
+        col = f"POPESTIMATE{year}"
+        if col in df.columns:
+            out[str(year)] = df[col].to_numpy()
+    return out
+
+
+def add_yoy(df: pd.DataFrame, year_cols: list[str]) -> pd.DataFrame:
+    """Append "{year}_yoy" fractional changes for consecutive year columns."""
+    values = df[year_cols].to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        yoy = (values[:, 1:] - values[:, :-1]) / values[:, :-1]
+    yoy_cols = [f"{year}_yoy" for year in year_cols[1:]]
+    return pd.concat([df, pd.DataFrame(yoy, columns=yoy_cols, index=df.index)], axis=1)
 
 
 def main():
@@ -70,109 +134,26 @@ def main():
 
     # Load all three files
     print("Loading data files...")
-    df_00 = load_and_filter_cities(data_dir / "sub-est00int.csv")
-    df_10 = load_and_filter_cities(data_dir / "sub-est2020int.csv")
-    df_20 = load_and_filter_cities(data_dir / "sub-est2024.csv")
-
-    print(f"  sub-est00int.csv: {len(df_00)} cities")
-    print(f"  sub-est2020int.csv: {len(df_10)} cities")
-    print(f"  sub-est2024.csv: {len(df_20)} cities")
-
-    # Extract population estimate columns for each dataset
-    # 2000-2010 data (sub-est00int.csv)
-    pop_cols_00 = [c for c in df_00.columns if c.startswith("POPESTIMATE")]
-    df_00_pop = df_00[["NAME", "STNAME"] + pop_cols_00].copy()
-
-    # 2010-2020 data (sub-est2020int.csv)
-    pop_cols_10 = [c for c in df_10.columns if c.startswith("POPESTIMATE")]
-    df_10_pop = df_10[["NAME", "STNAME"] + pop_cols_10].copy()
-
-    # 2020-2024 data (sub-est2024.csv)
-    pop_cols_20 = [c for c in df_20.columns if c.startswith("POPESTIMATE")]
-    df_20_pop = df_20[["NAME", "STNAME"] + pop_cols_20].copy()
-
-    # Extract city name (without " city" suffix)
-    df_00_pop["City"] = df_00_pop["NAME"].apply(extract_city_name)
-    df_10_pop["City"] = df_10_pop["NAME"].apply(extract_city_name)
-    df_20_pop["City"] = df_20_pop["NAME"].apply(extract_city_name)
-
-    # Add state abbreviation
-    df_00_pop["State"] = df_00_pop["STNAME"].map(STATE_ABBR)
-    df_10_pop["State"] = df_10_pop["STNAME"].map(STATE_ABBR)
-    df_20_pop["State"] = df_20_pop["STNAME"].map(STATE_ABBR)
-
-    # Create merge key
-    df_00_pop["key"] = df_00_pop["City"] + "_" + df_00_pop["State"]
-    df_10_pop["key"] = df_10_pop["City"] + "_" + df_10_pop["State"]
-    df_20_pop["key"] = df_20_pop["City"] + "_" + df_20_pop["State"]
-
-    # Rename columns to just years
-    for col in pop_cols_00:
-        year = col.replace("POPESTIMATE", "")
-        df_00_pop.rename(columns={col: year}, inplace=True)
-
-    for col in pop_cols_10:
-        year = col.replace("POPESTIMATE", "")
-        df_10_pop.rename(columns={col: year}, inplace=True)
-
-    for col in pop_cols_20:
-        year = col.replace("POPESTIMATE", "")
-        df_20_pop.rename(columns={col: year}, inplace=True)
-
-    # Drop non-year columns except key, City, State
-    years_00 = [str(y) for y in range(2000, 2011)]
-    years_10 = [str(y) for y in range(2010, 2020)]  # Skip 2010 from 00 file, use from 10 file
-    years_20 = [str(y) for y in range(2020, 2025)]
-
-    df_00_final = df_00_pop[["key", "City", "State"] + [y for y in years_00 if y in df_00_pop.columns]]
-    df_10_final = df_10_pop[["key"] + [y for y in years_10 if y in df_10_pop.columns]]
-    df_20_final = df_20_pop[["key"] + [y for y in years_20 if y in df_20_pop.columns]]
+    frames = []
+    for filename, years in SOURCES.items():
+        df = load_and_filter_cities(data_dir / filename, years)
+        print(f"  {filename}: {len(df)} cities")
+        frames.append(to_city_frame(df, years))
 
     # Merge datasets
     print("\nMerging datasets...")
-    # Start with 2000s data
-    merged = df_00_final.copy()
-
-    # Merge with 2010s data (use 2010 from this file, skip from 00)
-    # Remove 2010 from merged if present to avoid duplication
-    if "2010" in merged.columns:
-        merged = merged.drop(columns=["2010"])
-    merged = merged.merge(df_10_final, on="key", how="outer")
-
-    # Merge with 2020s data (skip 2020 from 10s file)
-    if "2020" in merged.columns:
-        merged = merged.drop(columns=["2020"])
-    merged = merged.merge(df_20_final, on="key", how="outer")
-
-    # Fill City and State from key for rows that only exist in later files
-    merged["City"] = merged.apply(
-        lambda row: row["key"].rsplit("_", 1)[0] if pd.isna(row["City"]) else row["City"],
-        axis=1
-    )
-    merged["State"] = merged.apply(
-        lambda row: row["key"].rsplit("_", 1)[1] if pd.isna(row["State"]) else row["State"],
-        axis=1
-    )
+    merged = frames[0]
+    for frame in frames[1:]:
+        merged = merged.merge(frame, on=["City", "State"], how="outer")
 
     # Get all year columns and sort them
-    year_cols = [c for c in merged.columns if c.isdigit()]
-    year_cols = sorted(year_cols, key=int)
+    year_cols = sorted((c for c in merged.columns if c.isdigit()), key=int)
 
     print(f"Years covered: {min(year_cols)} - {max(year_cols)}")
 
     # Calculate YoY changes
     print("Calculating YoY changes...")
-    yoy_cols = []
-    for i in range(1, len(year_cols)):
-        prev_year = year_cols[i - 1]
-        curr_year = year_cols[i]
-        yoy_col = f"{curr_year}_yoy"
-        merged[yoy_col] = (merged[curr_year] - merged[prev_year]) / merged[prev_year]
-        yoy_cols.append(yoy_col)
-
-    # Reorder columns: City, State, years, yoy changes
-    final_cols = ["City", "State"] + year_cols + yoy_cols
-    result = merged[final_cols].copy()
+    result = add_yoy(merged[["City", "State"] + year_cols], year_cols)
 
     # Sort by City, State
     result = result.sort_values(["City", "State"]).reset_index(drop=True)
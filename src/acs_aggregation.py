@@ -4,11 +4,19 @@ ACS Data Aggregation Script
 Aggregates ACS raw data columns to reduce dimensionality while preserving meaningful signals.
 - Input: data/acs_raw/acs_{year}.parquet (2009-2024, excluding 2020)
 - Output: data/acs_agg/acs_{year}.parquet
+- Spec: src/acs_aggregation_spec.json (output column -> source columns)
 """
 
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 
 # Constants
 RAW_DATA_DIR = Path("data/acs_raw")
@@ -17,411 +25,191 @@ YEARS = [y for y in range(2009, 2025) if y != 2020]
 ID_COLS = ["place_fips", "place_name", "state_fips", "year"]
 
 
-def load_raw_data(year: int) -> pd.DataFrame:
-    """Load a year's parquet file."""
+def load_raw_data(year: int, columns: list[str] | None = None) -> pd.DataFrame:
+    """Load a year's parquet file, reading only `columns` if given."""
     path = RAW_DATA_DIR / f"acs_{year}.parquet"
-    return pd.read_parquet(path)
+    return pd.read_parquet(path, columns=columns)
 
 
-def filter_estimate_columns(df: pd.DataFrame) -> pd.DataFrame:
-    """Keep only columns containing '_estimate_' but NOT containing 'annotation' or 'margin'."""
-    estimate_cols = [
+def estimate_columns(columns: list[str]) -> list[str]:
+    """Columns containing '_estimate_' but NOT containing 'annotation' or 'margin'."""
+    return [
         c
-        for c in df.columns
+        for c in columns
         if "_estimate_" in c
         and "margin" not in c.lower()
         and "annotation" not in c.lower()
     ]
-    return df[ID_COLS + estimate_cols]
-
-
-def get_col(df: pd.DataFrame, pattern: str) -> pd.Series:
-    """Get a column matching pattern, returning zeros if not found."""
-    matches = [c for c in df.columns if pattern in c]
-    if matches:
-        return df[matches[0]].fillna(0)
-    return pd.Series(0, index=df.index)
-
-
-def safe_sum(df: pd.DataFrame, patterns: list[str]) -> pd.Series:
-    """Sum columns matching patterns, handling missing columns gracefully."""
-    result = pd.Series(0, index=df.index, dtype=float)
-    for pattern in patterns:
-        result = result + get_col(df, pattern)
-    return result
-
-
-# =============================================================================
-# AGGREGATION FUNCTIONS
-# =============================================================================
-
-
-def aggregate_sex_by_age(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Aggregate sex_by_age columns into age buckets.
-    Output: 21 columns (total + 10 buckets for male + 10 buckets for female)
-    """
-    result = pd.DataFrame(index=df.index)
-
-    # Total
-    result["sex_by_age_total"] = get_col(df, "sex_by_age_estimate_total")
-
-    # Age bucket mappings
-    buckets = {
-        "age_18_and_under": [
-            "under_5_years",
-            "5_to_9_years",
-            "10_to_14_years",
-            "15_to_17_years",
-        ],
-        "age_19_to_21": ["18_and_19_years", "20_years", "21_years"],
-        "age_22_to_24": ["22_to_24_years"],
-        "age_25_to_29": ["25_to_29_years"],
-        "age_30_to_39": ["30_to_34_years", "35_to_39_years"],
-        "age_40_to_49": ["40_to_44_years", "45_to_49_years"],
-        "age_50_to_59": ["50_to_54_years", "55_to_59_years"],
-        "age_60_to_69": [
-            "60_and_61_years",
-            "62_to_64_years",
-            "65_and_66_years",
-            "67_to_69_years",
-        ],
-        "age_70_to_79": ["70_to_74_years", "75_to_79_years"],
-        "age_80_plus": ["80_to_84_years", "85_years_and_over"],
-    }
-
-    for sex in ["male", "female"]:
-        for bucket_name, age_groups in buckets.items():
-            patterns = [
-                f"sex_by_age_estimate_total_{sex}_{age}" for age in age_groups
-            ]
-            result[f"sex_by_age_{sex}_{bucket_name}"] = safe_sum(df, patterns)
-
-    return result
-
-
-def aggregate_school_enrollment(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Aggregate school_enrollment columns into education levels.
-    Output: 7 columns
-    """
-    result = pd.DataFrame(index=df.index)
-    prefix = "school_enrollment_by_detailed_level_of_school_for_the_population_3_years_and_over_estimate_total"
-
-    # Keep totals
-    result["school_enrollment_total"] = get_col(df, f"{prefix}")
-    result["school_enrollment_enrolled"] = get_col(df, f"{prefix}_enrolled_in_school")
-    result["school_enrollment_not_enrolled"] = get_col(df, f"{prefix}_not_enrolled_in_school")
-
-    # Aggregate below high school: nursery through grade 8
-    below_hs_patterns = [
-        f"{prefix}_enrolled_in_school_enrolled_in_nursery_school_preschool",
-        f"{prefix}_enrolled_in_school_enrolled_in_kindergarten",
-    ] + [f"{prefix}_enrolled_in_school_enrolled_in_grade_{i}" for i in range(1, 9)]
-    result["school_enrollment_below_high_school"] = safe_sum(df, below_hs_patterns)
-
-    # High school: grades 9-12
-    hs_patterns = [f"{prefix}_enrolled_in_school_enrolled_in_grade_{i}" for i in range(9, 13)]
-    result["school_enrollment_high_school"] = safe_sum(df, hs_patterns)
-
-    # Undergraduate
-    result["school_enrollment_undergraduate"] = get_col(
-        df, f"{prefix}_enrolled_in_school_enrolled_in_college_undergraduate_years"
-    )
-
-    # Graduate
-    result["school_enrollment_graduate"] = get_col(
-        df, f"{prefix}_enrolled_in_school_graduate_or_professional_school"
-    )
-
-    return result
-
-
-def aggregate_monthly_housing_costs(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Aggregate monthly_housing_costs into $500 increments.
-    Output: 9 columns
-    """
-    result = pd.DataFrame(index=df.index)
-    prefix = "monthly_housing_costs_estimate_total"
-
-    # Total and no cash rent
-    result["monthly_housing_costs_total"] = get_col(df, prefix)
-    result["monthly_housing_costs_no_cash_rent"] = get_col(df, f"{prefix}_no_cash_rent")
-
-    # Under $500
-    under_500_patterns = [
-        f"{prefix}_less_than_$100",
-        f"{prefix}_$100_to_$199",
-        f"{prefix}_$200_to_$299",
-        f"{prefix}_$300_to_$399",
-        f"{prefix}_$400_to_$499",
-    ]
-    result["monthly_housing_costs_under_500"] = safe_sum(df, under_500_patterns)
-
-    # $500-$999
-    mid_patterns = [
-        f"{prefix}_$500_to_$599",
-        f"{prefix}_$600_to_$699",
-        f"{prefix}_$700_to_$799",
-        f"{prefix}_$800_to_$899",
-        f"{prefix}_$900_to_$999",
-    ]
-    result["monthly_housing_costs_500_to_999"] = safe_sum(df, mid_patterns)
 
-    # Higher ranges (already aggregated in source)
-    result["monthly_housing_costs_1000_to_1499"] = get_col(df, f"{prefix}_$1_000_to_$1_499")
-    result["monthly_housing_costs_1500_to_1999"] = get_col(df, f"{prefix}_$1_500_to_$1_999")
-    result["monthly_housing_costs_2000_to_2499"] = get_col(df, f"{prefix}_$2_000_to_$2_499")
-    result["monthly_housing_costs_2500_to_2999"] = get_col(df, f"{prefix}_$2_500_to_$2_999")
-    result["monthly_housing_costs_3000_plus"] = get_col(df, f"{prefix}_$3_000_or_more")
 
-    return result
+def race_columns(columns: list[str]) -> list[str]:
+    """Columns containing 'race' in the name."""
+    return [c for c in columns if "race" in c.lower()]
 
 
-def aggregate_gross_rent_pct_income(df: pd.DataFrame) -> pd.DataFrame:
+def projected_columns(year: int) -> tuple[list[str], int]:
     """
-    Aggregate gross_rent_as_percentage_of_income into ~10% increments.
-    Output: 6 columns
+    Columns aggregation needs from a year's raw file (identifiers plus non-race
+    estimates), decided from the parquet schema alone. Returns (columns, total columns).
     """
-    result = pd.DataFrame(index=df.index)
-    prefix = "gross_rent_as_a_percentage_of_household_income_in_the_past_12_months_estimate_total"
-
-    # Total and not computed
-    result["gross_rent_pct_income_total"] = get_col(df, prefix)
-    result["gross_rent_pct_income_not_computed"] = get_col(df, f"{prefix}_not_computed")
-
-    # Under 20%
-    under_20_patterns = [
-        f"{prefix}_less_than_10.0_percent",
-        f"{prefix}_10.0_to_14.9_percent",
-        f"{prefix}_15.0_to_19.9_percent",
-    ]
-    result["gross_rent_pct_income_under_20"] = safe_sum(df, under_20_patterns)
+    names = pq.read_schema(RAW_DATA_DIR / f"acs_{year}.parquet").names
+    race = set(race_columns(names))
+    return ID_COLS + [c for c in estimate_columns(names) if c not in race], len(names)
 
-    # 20-29%
-    pct_20_29_patterns = [
-        f"{prefix}_20.0_to_24.9_percent",
-        f"{prefix}_25.0_to_29.9_percent",
-    ]
-    result["gross_rent_pct_income_20_to_29"] = safe_sum(df, pct_20_29_patterns)
-
-    # 30-39%
-    pct_30_39_patterns = [
-        f"{prefix}_30.0_to_34.9_percent",
-        f"{prefix}_35.0_to_39.9_percent",
-    ]
-    result["gross_rent_pct_income_30_to_39"] = safe_sum(df, pct_30_39_patterns)
-
-    # 40%+
-    pct_40_plus_patterns = [
-        f"{prefix}_40.0_to_49.9_percent",
-        f"{prefix}_50.0_percent_or_more",
-    ]
-    result["gross_rent_pct_income_40_plus"] = safe_sum(df, pct_40_plus_patterns)
 
-    return result
+def filter_estimate_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Keep only columns containing '_estimate_' but NOT containing 'annotation' or 'margin'."""
+    return df[ID_COLS + estimate_columns(df.columns)]
 
 
-def aggregate_poverty_ratio(df: pd.DataFrame) -> pd.DataFrame:
+class ColumnPlan:
     """
-    Aggregate ratio_of_income_to_poverty into binary split at poverty line (1.0).
-    Output: 3 columns
+    Pattern -> source column resolution for one schema.
+    An exact column name wins; otherwise the first column containing the pattern is
+    used and the pattern is flagged as ambiguous if more than one column contains it.
+    Each pattern is resolved once per schema.
     """
-    result = pd.DataFrame(index=df.index)
-    prefix = "ratio_of_income_to_poverty_level_of_families_in_the_past_12_months_estimate_total"
 
-    # Total
-    result["poverty_ratio_total"] = get_col(df, prefix)
+    def __init__(self, columns: list[str]):
+        self.columns = list(columns)
+        self.fingerprint = hashlib.sha256("\n".join(self.columns).encode()).hexdigest()[:16]
+        self._exact = set(self.columns)
+        self._resolved: dict[str, str | None] = {}
+        self._matching: dict[str, list[str]] = {}
+        self.unresolved: list[str] = []
+        self.ambiguous: dict[str, list[str]] = {}
+
+    def matching(self, pattern: str) -> list[str]:
+        """All columns containing pattern, in schema order."""
+        if pattern not in self._matching:
+            self._matching[pattern] = [c for c in self.columns if pattern in c]
+        return self._matching[pattern]
+
+    def resolve(self, pattern: str) -> str | None:
+        """The source column for pattern, or None if no column matches."""
+        if pattern in self._resolved:
+            return self._resolved[pattern]
+        if pattern in self._exact:
+            column = pattern
+        else:
+            matches = self.matching(pattern)
+            column = matches[0] if matches else None
+            if column is None:
+                self.unresolved.append(pattern)
+            elif len(matches) > 1:
+                self.ambiguous[pattern] = matches
+        self._resolved[pattern] = column
+        return column
+
+    def report(self) -> dict:
+        """Schema fingerprint plus unresolved and ambiguous patterns seen so far."""
+        return {
+            "fingerprint": self.fingerprint,
+            "resolved": sum(c is not None for c in self._resolved.values()),
+            "unresolved": list(self.unresolved),
+            "ambiguous": dict(self.ambiguous),
+        }
 
-    # At or below poverty (under 1.0)
-    below_patterns = [
-        f"{prefix}_under_.50",
-        f"{prefix}_.50_to_.74",
-        f"{prefix}_.75_to_.99",
-    ]
-    result["poverty_ratio_at_or_below"] = safe_sum(df, below_patterns)
-
-    # Above poverty (1.0 and over)
-    above_patterns = [
-        f"{prefix}_1.00_to_1.24",
-        f"{prefix}_1.25_to_1.49",
-        f"{prefix}_1.50_to_1.74",
-        f"{prefix}_1.75_to_1.84",
-        f"{prefix}_1.85_to_1.99",
-        f"{prefix}_2.00_to_2.99",
-        f"{prefix}_3.00_to_3.99",
-        f"{prefix}_4.00_to_4.99",
-        f"{prefix}_5.00_and_over",
-    ]
-    result["poverty_ratio_above"] = safe_sum(df, above_patterns)
 
-    return result
+# Plans by schema: years with the same columns share one plan and skip resolution
+_PLANS: dict[tuple[str, ...], ColumnPlan] = {}
 
+# Resolution report of the plan used for each aggregated year
+RESOLUTION_REPORTS: dict[int, dict] = {}
 
-def aggregate_travel_time(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Aggregate travel_time_to_work into 10-minute increments.
-    Output: 7 columns
-    """
-    result = pd.DataFrame(index=df.index)
-    prefix = "travel_time_to_work_estimate_total"
-
-    # Total
-    result["travel_time_total"] = get_col(df, prefix)
-
-    # Under 10 min
-    result["travel_time_under_10"] = safe_sum(
-        df, [f"{prefix}_less_than_5_minutes", f"{prefix}_5_to_9_minutes"]
-    )
-
-    # 10-19 min
-    result["travel_time_10_to_19"] = safe_sum(
-        df, [f"{prefix}_10_to_14_minutes", f"{prefix}_15_to_19_minutes"]
-    )
-
-    # 20-29 min
-    result["travel_time_20_to_29"] = safe_sum(
-        df, [f"{prefix}_20_to_24_minutes", f"{prefix}_25_to_29_minutes"]
-    )
-
-    # 30-39 min
-    result["travel_time_30_to_39"] = safe_sum(
-        df, [f"{prefix}_30_to_34_minutes", f"{prefix}_35_to_39_minutes"]
-    )
-
-    # 40-59 min
-    result["travel_time_40_to_59"] = safe_sum(
-        df, [f"{prefix}_40_to_44_minutes", f"{prefix}_45_to_59_minutes"]
-    )
-
-    # 60+ min
-    result["travel_time_60_plus"] = safe_sum(
-        df, [f"{prefix}_60_to_89_minutes", f"{prefix}_90_or_more_minutes"]
-    )
 
-    return result
+def get_plan(columns) -> ColumnPlan:
+    """Return the cached ColumnPlan for a set of columns, compiling it on first use."""
+    key = tuple(columns)
+    plan = _PLANS.get(key)
+    if plan is None:
+        plan = _PLANS[key] = ColumnPlan(key)
+    return plan
 
 
-def filter_transportation(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Keep only transportation mode totals, drop all age breakdowns.
-    Output: 7 columns
-    """
-    result = pd.DataFrame(index=df.index)
-    prefix = "means_of_transportation_to_work_by_age_estimate_total"
-
-    # Total
-    result["transportation_total"] = get_col(df, prefix)
-
-    # Mode totals (not ending in age groups)
-    result["transportation_drove_alone"] = get_col(
-        df, f"{prefix}_car_truck_or_van_drove_alone"
-    )
-    result["transportation_carpooled"] = get_col(
-        df, f"{prefix}_car_truck_or_van_carpooled"
-    )
-    result["transportation_public_transit"] = get_col(
-        df, f"{prefix}_public_transportation_excluding_taxicab"
-    )
-    result["transportation_walked"] = get_col(df, f"{prefix}_walked")
-    result["transportation_taxi_bike_other"] = get_col(
-        df, f"{prefix}_taxicab_motorcycle_bicycle_or_other_means"
-    )
-    result["transportation_worked_from_home"] = get_col(
-        df, f"{prefix}_worked_from_home"
-    )
+# =============================================================================
+# AGGREGATION SPEC
+# =============================================================================
 
-    return result
+SPEC_PATH = Path(__file__).with_name("acs_aggregation_spec.json")
 
 
-def rename_geo_mobility(df: pd.DataFrame) -> pd.DataFrame:
+def load_spec(path: Path = SPEC_PATH) -> dict:
     """
-    Keep geographical_mobility columns, rename for brevity.
-    Output: 30 columns
+    Load the aggregation spec: an ordered list of groups. Each group maps output
+    columns to one source pattern (copied) or a list of patterns (summed), or has a
+    rename_prefix rule that keeps every column containing a pattern under a short prefix.
     """
-    result = pd.DataFrame(index=df.index)
-    long_prefix = "geographical_mobility_in_the_past_year_by_educational_attainment_for_residence_1_year_ago_in_the_united_states_estimate_total_living_in_area_1_year_ago"
-    short_prefix = "geo_mobility"
-
-    geo_cols = [c for c in df.columns if long_prefix in c]
+    return json.loads(path.read_text())
 
-    for col in geo_cols:
-        # Create shorter name
-        suffix = col.replace(long_prefix, "").strip("_")
-        if suffix == "":
-            new_name = f"{short_prefix}_total"
-        else:
-            new_name = f"{short_prefix}_{suffix}"
-        result[new_name] = df[col].fillna(0)
 
-    return result
+AGGREGATION_SPEC = load_spec()
 
 
-def extract_other_variables(df: pd.DataFrame) -> pd.DataFrame:
+class AggregationMatrix:
     """
-    Keep other variable groups as-is with simplified names.
-    Output: ~26 columns
+    The spec compiled against one schema: the source columns to read, the output
+    columns produced, and a (sources x outputs) summation matrix with a 1 wherever a
+    source contributes to an output. Aggregating a year is one matmul.
+    Missing sources are left out of the matrix, so their outputs are zero.
     """
-    result = pd.DataFrame(index=df.index)
-
-    # Total population
-    result["total_population"] = get_col(df, "total_population_estimate_total")
-
-    # Gini index
-    result["gini_index"] = get_col(df, "gini_index_of_income_inequality_estimate_gini_index")
-
-    # Income quintiles
-    quintile_map = {
-        "income_quintile_lowest": "mean_household_income_of_quintiles_estimate_quintile_means_lowest_quintile",
-        "income_quintile_second": "mean_household_income_of_quintiles_estimate_quintile_means_second_quintile",
-        "income_quintile_third": "mean_household_income_of_quintiles_estimate_quintile_means_third_quintile",
-        "income_quintile_fourth": "mean_household_income_of_quintiles_estimate_quintile_means_fourth_quintile",
-        "income_quintile_highest": "mean_household_income_of_quintiles_estimate_quintile_means_highest_quintile",
-        "income_quintile_top_5_pct": "mean_household_income_of_quintiles_estimate_top_5_percent",
-    }
-    for new_name, old_pattern in quintile_map.items():
-        result[new_name] = get_col(df, old_pattern)
-
-    # Hours worked
-    hours_map = {
-        "hours_worked_total": "mean_usual_hours_worked_in_the_past_12_months_for_workers_16_to_64_years_estimate_mean_usual_hours_total",
-        "hours_worked_male": "mean_usual_hours_worked_in_the_past_12_months_for_workers_16_to_64_years_estimate_mean_usual_hours_total_male",
-        "hours_worked_female": "mean_usual_hours_worked_in_the_past_12_months_for_workers_16_to_64_years_estimate_mean_usual_hours_total_female",
-    }
-    for new_name, old_pattern in hours_map.items():
-        result[new_name] = get_col(df, old_pattern)
-
-    # Bachelor's degrees
-    bachelors_prefix = "total_fields_of_bachelor_s_degrees_reported_estimate_total"
-    bachelors_map = {
-        "bachelors_degree_total": bachelors_prefix,
-        "bachelors_degree_computers_math_stats": f"{bachelors_prefix}_science_and_engineering_computers_mathematics_and_statistics",
-        "bachelors_degree_bio_ag_env": f"{bachelors_prefix}_science_and_engineering_biological_agricultural_and_environmental_sciences",
-        "bachelors_degree_physical_sciences": f"{bachelors_prefix}_science_and_engineering_physical_and_related_sciences",
-        "bachelors_degree_psychology": f"{bachelors_prefix}_science_and_engineering_psychology",
-        "bachelors_degree_social_sciences": f"{bachelors_prefix}_science_and_engineering_social_sciences",
-        "bachelors_degree_engineering": f"{bachelors_prefix}_science_and_engineering_engineering",
-        "bachelors_degree_multidisciplinary": f"{bachelors_prefix}_science_and_engineering_multidisciplinary_studies",
-        "bachelors_degree_stem_related": f"{bachelors_prefix}_science_and_engineering_related_fields",
-        "bachelors_degree_business": f"{bachelors_prefix}_business",
-        "bachelors_degree_education": f"{bachelors_prefix}_education",
-        "bachelors_degree_literature_languages": f"{bachelors_prefix}_arts_humanities_and_other_literature_and_languages",
-        "bachelors_degree_liberal_arts_history": f"{bachelors_prefix}_arts_humanities_and_other_liberal_arts_and_history",
-        "bachelors_degree_visual_performing_arts": f"{bachelors_prefix}_arts_humanities_and_other_visual_and_performing_arts",
-        "bachelors_degree_communications": f"{bachelors_prefix}_arts_humanities_and_other_communications",
-        "bachelors_degree_other": f"{bachelors_prefix}_arts_humanities_and_other_other",
-    }
-    for new_name, old_pattern in bachelors_map.items():
-        result[new_name] = get_col(df, old_pattern)
 
-    return result
+    def __init__(self, spec: dict, plan: ColumnPlan):
+        self.sources: list[str] = []
+        self.outputs: list[str] = []
+        source_index: dict[str, int] = {}
+        rows: list[int] = []
+        cols: list[int] = []
+
+        def add_output(name: str, columns: list[str]) -> None:
+            for column in columns:
+                if column not in source_index:
+                    source_index[column] = len(self.sources)
+                    self.sources.append(column)
+                rows.append(source_index[column])
+                cols.append(len(self.outputs))
+            self.outputs.append(name)
+
+        for group in spec["groups"]:
+            if "rename_prefix" in group:
+                rule = group["rename_prefix"]
+                for column in plan.matching(rule["pattern"]):
+                    suffix = column.replace(rule["pattern"], "").strip("_")
+                    add_output(f"{rule['prefix']}_{suffix or 'total'}", [column])
+                continue
+            for output, patterns in group["columns"].items():
+                if isinstance(patterns, str):
+                    patterns = [patterns]
+                add_output(output, [c for c in map(plan.resolve, patterns) if c is not None])
+
+        # ~240 x ~120 and mostly zeros; built from (row, col) pairs but kept dense,
+        # since at this size a dense matmul is faster than a sparse one
+        self.weights = np.zeros((len(self.sources), len(self.outputs)))
+        np.add.at(self.weights, (rows, cols), 1.0)
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Aggregate a frame with this schema: missing values count as zero."""
+        values = df[self.sources].to_numpy(dtype=np.float64, na_value=0.0)
+        return pd.DataFrame(values @ self.weights, index=df.index, columns=self.outputs)
+
+
+# Compiled matrices by schema fingerprint
+_MATRICES: dict[str, AggregationMatrix] = {}
+
+
+def compile_spec(columns, spec: dict | None = None) -> AggregationMatrix:
+    """Return the AggregationMatrix for a schema, compiling the spec on first use."""
+    plan = get_plan(columns)
+    if spec is not None:
+        return AggregationMatrix(spec, plan)
+    if plan.fingerprint not in _MATRICES:
+        _MATRICES[plan.fingerprint] = AggregationMatrix(AGGREGATION_SPEC, plan)
+    return _MATRICES[plan.fingerprint]
 
 
 def exclude_race_columns(df: pd.DataFrame) -> pd.DataFrame:
     """Drop all columns containing 'race' in the name."""
-    race_cols = [c for c in df.columns if "race" in c.lower()]
-    return df.drop(columns=race_cols, errors="ignore")
+    return df.drop(columns=race_columns(df.columns), errors="ignore")
 
 
 def save_aggregated(df: pd.DataFrame, year: int) -> None:
@@ -439,55 +227,74 @@ def aggregate_year(year: int, verbose: bool = True) -> pd.DataFrame:
     if verbose:
         print(f"\nProcessing year {year}...")
 
-    # Load and filter
-    df = load_raw_data(year)
-    original_cols = len(df.columns)
-
-    df = filter_estimate_columns(df)
-    df = exclude_race_columns(df)
-
-    # Apply all aggregations
-    aggregated_dfs = [
-        df[ID_COLS],  # Keep identifiers
-        aggregate_sex_by_age(df),
-        aggregate_school_enrollment(df),
-        aggregate_monthly_housing_costs(df),
-        aggregate_gross_rent_pct_income(df),
-        aggregate_poverty_ratio(df),
-        aggregate_travel_time(df),
-        filter_transportation(df),
-        rename_geo_mobility(df),
-        extract_other_variables(df),
-    ]
+    # Load only identifier and non-race estimate columns; margins and annotations are never read
+    columns, original_cols = projected_columns(year)
+    df = load_raw_data(year, columns=columns)
 
-    # Combine all
-    result = pd.concat(aggregated_dfs, axis=1)
+    # Apply the compiled spec: one matmul over the estimate block
+    matrix = compile_spec(df.columns)
+    result = pd.concat([df[ID_COLS], matrix.apply(df)], axis=1)
+    resolution = RESOLUTION_REPORTS[year] = get_plan(df.columns).report()
 
     if verbose:
         print(f"  Original columns: {original_cols}")
         print(f"  Aggregated columns: {len(result.columns)}")
         print(f"  Rows: {len(result)}")
+        print(
+            f"  Column plan {resolution['fingerprint']}: {resolution['resolved']} resolved, "
+            f"{len(resolution['unresolved'])} unresolved, {len(resolution['ambiguous'])} ambiguous"
+        )
 
     return result
 
 
-def process_all_years(verbose: bool = True) -> dict:
+def _process_year(year: int, verbose: bool) -> dict:
+    """Aggregate and save one year. Runs in a worker process when workers > 1."""
+    df = aggregate_year(year, verbose=verbose)
+    save_aggregated(df, year)
+    return {
+        "rows": len(df),
+        "columns": list(df.columns),
+        "resolution": RESOLUTION_REPORTS[year],
+    }
+
+
+def process_all_years(verbose: bool = True, workers: int = 1, years: list[int] | None = None) -> dict:
     """
     Process all years and generate column availability report.
+    With workers > 1, years are aggregated in a process pool. A failed year is
+    recorded as {"error": message} and does not stop the others; results are
+    merged in year order, so the report is the same for any worker count.
     """
     AGG_DATA_DIR.mkdir(parents=True, exist_ok=True)
-
-    results = {}
+    years = YEARS if years is None else years
+
+    outcomes = {}
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(years))) as pool:
+            futures = {pool.submit(_process_year, year, False): year for year in years}
+            for future in as_completed(futures):
+                year = futures[future]
+                try:
+                    outcomes[year] = future.result()
+                    if verbose:
+                        print(f"  {year}: {outcomes[year]['rows']} rows, {len(outcomes[year]['columns'])} columns")
+                except Exception as e:
+                    outcomes[year] = {"error": f"{type(e).__name__}: {e}"}
+    else:
+        for year in years:
+            try:
+                outcomes[year] = _process_year(year, verbose)
+            except Exception as e:
+                outcomes[year] = {"error": f"{type(e).__name__}: {e}"}
+
+    # Merge in year order so column availability does not depend on completion order
+    results = {year: outcomes[year] for year in years}
+    failed = {year: r["error"] for year, r in results.items() if "error" in r}
+    succeeded = [year for year in years if year not in failed]
     all_columns = set()
-
-    for year in YEARS:
-        df = aggregate_year(year, verbose=verbose)
-        save_aggregated(df, year)
-        results[year] = {
-            "rows": len(df),
-            "columns": list(df.columns),
-        }
-        all_columns.update(df.columns)
+    for year in succeeded:
+        all_columns.update(results[year]["columns"])
 
     # Generate column availability report
     if verbose:
@@ -498,18 +305,42 @@ def process_all_years(verbose: bool = True) -> dict:
         # Check which columns are missing in which years
         for col in sorted(all_columns):
             missing_years = []
-            for year in YEARS:
+            for year in succeeded:
                 if col not in results[year]["columns"]:
                     missing_years.append(year)
             if missing_years:
                 print(f"  {col}: missing in {missing_years}")
 
+        print("\n" + "=" * 60)
+        print("COLUMN RESOLUTION REPORT")
+        print("=" * 60)
+
+        # Patterns that matched no source column (output filled with zeros) or several
+        unresolved: dict[str, list[int]] = {}
+        ambiguous: dict[str, list[int]] = {}
+        for year in succeeded:
+            resolution = results[year]["resolution"]
+            for pattern in resolution["unresolved"]:
+                unresolved.setdefault(pattern, []).append(year)
+            for pattern in resolution["ambiguous"]:
+                ambiguous.setdefault(pattern, []).append(year)
+        for pattern, pattern_years in sorted(unresolved.items()):
+            print(f"  unresolved {pattern}: {pattern_years}")
+        for pattern, pattern_years in sorted(ambiguous.items()):
+            print(f"  ambiguous {pattern}: {pattern_years}")
+        plans = {results[year]["resolution"]["fingerprint"] for year in succeeded}
+        print(f"  {len(plans)} distinct column plans across {len(succeeded)} years")
+
         print("\n" + "=" * 60)
         print("SUMMARY")
         print("=" * 60)
-        print(f"Total years processed: {len(YEARS)}")
+        print(f"Total years processed: {len(succeeded)}")
         print(f"Total unique columns: {len(all_columns)}")
-        print(f"Years: {YEARS}")
+        print(f"Years: {succeeded}")
+        if failed:
+            print(f"Failed years: {len(failed)}")
+            for year, error in failed.items():
+                print(f"  {year}: {error}")
 
     return results
 
@@ -535,27 +366,32 @@ def validate_output(verbose: bool = True) -> bool:
             all_valid = False
             continue
 
-        raw_df = pd.read_parquet(raw_path)
-        agg_df = pd.read_parquet(agg_path)
+        # Row and column counts come from the parquet footers; no data pages are read
+        raw_meta = pq.read_metadata(raw_path)
+        agg_meta = pq.read_metadata(agg_path)
 
         # Check row counts match
-        if len(raw_df) != len(agg_df):
+        if raw_meta.num_rows != agg_meta.num_rows:
             if verbose:
-                print(f"  {year}: Row count mismatch (raw={len(raw_df)}, agg={len(agg_df)})")
+                print(f"  {year}: Row count mismatch (raw={raw_meta.num_rows}, agg={agg_meta.num_rows})")
             all_valid = False
         else:
             if verbose:
-                print(f"  {year}: OK (rows={len(agg_df)}, cols={len(agg_df.columns)})")
+                print(f"  {year}: OK (rows={agg_meta.num_rows}, cols={agg_meta.num_columns})")
 
     return all_valid
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aggregate raw ACS years.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (1 = sequential)")
+    args = parser.parse_args()
+
     print("ACS Data Aggregation Pipeline")
     print("=" * 60)
 
     # Process all years
-    results = process_all_years(verbose=True)
+    results = process_all_years(verbose=True, workers=args.workers)
 
     # Validate output
     is_valid = validate_output(verbose=True)
@@ -0,0 +1,192 @@
+"""
+ACS Panel Store
+
+Consolidates the per-year aggregates into one place-year panel dataset.
+- Input: data/acs_agg/acs_{year}.parquet
+- Output: data/acs_panel/state_fips={fips}/part-0.parquet (hive-partitioned by state)
+- Schema: one row per (place_fips, year), the union of all years' columns,
+  values as float32 (null where a year lacks the column), place_fips dictionary-encoded
+- Rows sorted by place_fips then year, so a place's history is contiguous
+- Each build is written to a temp directory and swapped in whole, so no partition
+  from an older build (e.g. a state no longer produced) survives a rebuild
+
+load_panel() pushes year-range, state and column filters down to pyarrow: a state
+filter opens only that state's files and a column subset reads only those column chunks.
+"""
+
+import argparse
+import json
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .acs_aggregation import AGG_DATA_DIR, ID_COLS, YEARS
+
+PANEL_DIR = AGG_DATA_DIR.parent / "acs_panel"
+PANEL_META = PANEL_DIR / "_panel.json"
+ROWS_PER_GROUP = 16_384
+
+# Written with plain string keys; read back with state_fips as a dictionary column
+WRITE_PARTITIONING = ds.partitioning(pa.schema([("state_fips", pa.string())]), flavor="hive")
+READ_PARTITIONING = ds.HivePartitioning.discover(
+    schema=pa.schema([("state_fips", pa.dictionary(pa.int32(), pa.string()))])
+)
+
+
+def _read_year(year: int) -> pa.Table:
+    """Read one year's aggregate with compact id and value types."""
+    table = pq.read_table(AGG_DATA_DIR / f"acs_{year}.parquet")
+    columns = {}
+    for name in table.column_names:
+        col = table[name]
+        if name in ("place_fips", "place_name", "state_fips"):
+            columns[name] = col.cast(pa.string())
+        elif name == "year":
+            columns[name] = col.cast(pa.int16())
+        else:
+            columns[name] = col.cast(pa.float32())
+    return pa.table(columns)
+
+
+def build_panel(years: list[int] | None = None, verbose: bool = True) -> dict:
+    """
+    Build the panel from the aggregated years and write it under PANEL_DIR.
+    Returns the panel metadata: years, rows, value columns and per-column availability.
+    """
+    years = YEARS if years is None else list(years)
+    if not years:
+        raise ValueError("build_panel needs at least one year")
+    tables = []
+    value_cols: list[str] = []
+    availability: dict[str, list[int]] = {}
+    for year in years:
+        table = _read_year(year)
+        for name in table.column_names:
+            if name in ID_COLS:
+                continue
+            if name not in availability:
+                availability[name] = []
+                value_cols.append(name)
+            availability[name].append(year)
+        tables.append(table)
+
+    # Unified schema: columns a year lacks become nulls
+    schema = pa.schema(
+        [
+            ("place_fips", pa.string()),
+            ("place_name", pa.string()),
+            ("state_fips", pa.string()),
+            ("year", pa.int16()),
+        ]
+        + [(name, pa.float32()) for name in value_cols]
+    )
+    panel = pa.concat_tables(tables, promote_options="permissive").select(schema.names).cast(schema)
+    panel = panel.sort_by([("place_fips", "ascending"), ("year", "ascending")])
+    panel = panel.set_column(
+        panel.schema.get_field_index("place_fips"), "place_fips", pc.dictionary_encode(panel["place_fips"])
+    )
+
+    # Write the whole dataset next to the old one, then swap the directories
+    build_dir = PANEL_DIR.with_name(f"{PANEL_DIR.name}.tmp{os.getpid()}")
+    shutil.rmtree(build_dir, ignore_errors=True)
+    ds.write_dataset(
+        panel,
+        build_dir,
+        format="parquet",
+        partitioning=WRITE_PARTITIONING,
+        existing_data_behavior="error",
+        file_options=ds.ParquetFileFormat().make_write_options(compression="zstd"),
+        basename_template="part-{i}.parquet",
+        preserve_order=True,
+        min_rows_per_group=ROWS_PER_GROUP,
+        max_rows_per_group=ROWS_PER_GROUP,
+    )
+
+    meta = {
+        "years": years,
+        "rows": panel.num_rows,
+        "value_columns": value_cols,
+        "availability": {c: y for c, y in availability.items() if y != years},
+    }
+    (build_dir / PANEL_META.name).write_text(json.dumps(meta, indent=2))
+    old_dir = PANEL_DIR.with_name(f"{PANEL_DIR.name}.old{os.getpid()}")
+    if PANEL_DIR.exists():
+        os.replace(PANEL_DIR, old_dir)
+    os.replace(build_dir, PANEL_DIR)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+    if verbose:
+        print(f"Panel: {panel.num_rows} rows x {len(value_cols)} value columns, years {years[0]}-{years[-1]}")
+        print(f"  States: {pc.count_distinct(panel['state_fips']).as_py()}")
+        print(f"  Columns missing in some years: {len(meta['availability'])}")
+        print(f"Saved: {PANEL_DIR}")
+
+    return meta
+
+
+def panel_dataset() -> ds.Dataset:
+    """The panel as a pyarrow dataset (state_fips comes from the partition path)."""
+    return ds.dataset(PANEL_DIR, format="parquet", partitioning=READ_PARTITIONING)
+
+
+def panel_filter(
+    years: tuple[int, int] | None = None,
+    states: list[str] | None = None,
+    places: list[str] | None = None,
+) -> ds.Expression | None:
+    """Build a pushdown filter for an inclusive year range, state FIPS codes and place FIPS codes."""
+    conditions = []
+    if years is not None:
+        conditions.append((ds.field("year") >= years[0]) & (ds.field("year") <= years[1]))
+    if states is not None:
+        conditions.append(ds.field("state_fips").isin(states))
+    if places is not None:
+        conditions.append(ds.field("place_fips").isin(places))
+    if not conditions:
+        return None
+    expression = conditions[0]
+    for condition in conditions[1:]:
+        expression = expression & condition
+    return expression
+
+
+def load_panel(
+    columns: list[str] | None = None,
+    years: tuple[int, int] | None = None,
+    states: list[str] | None = None,
+    places: list[str] | None = None,
+    as_arrow: bool = False,
+) -> pd.DataFrame | pa.Table:
+    """
+    Load part of the panel. Identifier columns are always included; `columns` selects
+    value columns (all if None). Only matching state partitions and the requested
+    column chunks are read. Rows come back sorted by place_fips and year, the order
+    they are stored in (state partitions in FIPS order, each sorted by place and year).
+    """
+    dataset = panel_dataset()
+    # The partition key is appended to the dataset schema; put identifiers first again
+    value_cols = [c for c in dataset.schema.names if c not in ID_COLS]
+    if columns is not None:
+        unknown = [c for c in columns if c not in value_cols and c not in ID_COLS]
+        if unknown:
+            raise KeyError(f"Columns not in panel: {unknown}")
+        value_cols = [c for c in columns if c not in ID_COLS]
+    columns = ID_COLS + value_cols
+    table = dataset.to_table(columns=columns, filter=panel_filter(years, states, places))
+    return table if as_arrow else table.to_pandas()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the consolidated ACS panel store.")
+    parser.add_argument("--years", nargs=2, type=int, metavar=("START", "END"), help="Restrict to a year range")
+    args = parser.parse_args()
+
+    years = None
+    if args.years:
+        years = [y for y in YEARS if args.years[0] <= y <= args.years[1]]
+    build_panel(years)
@@ -0,0 +1,125 @@
+"""
+On-disk cache for Census API responses.
+
+Raw response bodies are stored gzip-compressed under data/http_cache/{year}/,
+keyed by the SHA-256 of the request URL with the API key removed and query params
+sorted, with the URL, ETag and fetch time in a small .meta.json sidecar. Past ACS
+vintages never change, so a hit skips the network entirely.
+
+404s (a vintage or group not published yet) and empty 204s (a state with no ACS1
+places) are cached as an empty body for NOT_FOUND_TTL only, so a later run asks
+again once Census may have released it.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+CACHE_DIR = PROJECT_ROOT / "data" / "http_cache"
+NOT_FOUND_BODY = b"[]"
+NOT_FOUND_TTL = 24 * 3600  # seconds
+
+
+def normalize_url(url: str) -> str:
+    """Drop the API key and sort query params so equivalent requests share a key."""
+    parts = urlsplit(url)
+    params = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != "key")
+    query = urlencode(params, safe="():,*")
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, query, ""))
+
+
+def cache_path(url: str) -> Path:
+    """Path of the cache entry for a URL, grouped by the vintage year in the URL path."""
+    normalized = normalize_url(url)
+    digest = hashlib.sha256(normalized.encode()).hexdigest()
+    match = re.search(r"/data/(\d{4})/", normalized)
+    year_dir = match.group(1) if match else "other"
+    return CACHE_DIR / year_dir / digest[:2] / f"{digest}.json.gz"
+
+
+def meta_path(url: str) -> Path:
+    """Path of the metadata sidecar for a cache entry."""
+    path = cache_path(url)
+    return path.with_name(path.name.replace(".json.gz", ".meta.json"))
+
+
+def load(url: str) -> bytes | None:
+    """Return the cached response body for a URL, or None on a miss (or an expired 404)."""
+    path = cache_path(url)
+    meta_file = meta_path(url)
+    # The sidecar is written last, so its presence marks a complete entry
+    if not meta_file.exists():
+        return None
+    try:
+        with gzip.open(path, "rb") as f:
+            body = f.read()
+        if body == NOT_FOUND_BODY and time.time() - meta_file.stat().st_mtime > NOT_FOUND_TTL:
+            if json.loads(meta_file.read_text()).get("not_found"):
+                return None
+    except (OSError, json.JSONDecodeError):
+        return None
+    return body
+
+
+def store(url: str, body: bytes, etag: str | None = None, not_found: bool = False) -> None:
+    """
+    Write a response body plus its ETag and fetch timestamp. Writes are atomic.
+    not_found marks a 404, which expires after NOT_FOUND_TTL.
+    """
+    path = cache_path(url)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".tmp{os.getpid()}")
+    with gzip.open(tmp_path, "wb") as f:
+        f.write(body)
+    os.replace(tmp_path, path)
+
+    meta = {
+        "url": normalize_url(url),
+        "etag": etag,
+        "fetched_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    if not_found:
+        meta["not_found"] = True
+    meta_file = meta_path(url)
+    tmp_meta = meta_file.with_suffix(f".tmp{os.getpid()}")
+    tmp_meta.write_text(json.dumps(meta))
+    os.replace(tmp_meta, meta_file)
+
+
+def invalidate_year(year: int) -> int:
+    """Delete all cached responses for one vintage year. Returns the number of entries removed."""
+    year_dir = CACHE_DIR / str(year)
+    if not year_dir.exists():
+        return 0
+    count = sum(1 for _ in year_dir.rglob("*.json.gz"))
+    shutil.rmtree(year_dir)
+    return count
+
+
+def cache_size() -> dict[str, tuple[int, int]]:
+    """Return {year_dir: (entries, bytes)} for everything in the cache."""
+    sizes = {}
+    if not CACHE_DIR.exists():
+        return sizes
+    for year_dir in sorted(p for p in CACHE_DIR.iterdir() if p.is_dir()):
+        files = list(year_dir.rglob("*.json.gz"))
+        sizes[year_dir.name] = (len(files), sum(f.stat().st_size for f in files))
+    return sizes
+
+
+def print_cache_summary() -> None:
+    """Print entries and size per year."""
+    sizes = cache_size()
+    total_entries = sum(n for n, _ in sizes.values())
+    total_bytes = sum(b for _, b in sizes.values())
+    print(f"Cache: {CACHE_DIR}")
+    for year_dir, (entries, size) in sizes.items():
+        print(f"  {year_dir}: {entries} responses, {size / 1e6:.1f} MB")
+    print(f"  Total: {total_entries} responses, {total_bytes / 1e6:.1f} MB")
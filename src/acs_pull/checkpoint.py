@@ -0,0 +1,136 @@
+"""
+Per-(year, state) checkpoints for resumable ACS pulls.
+
+Each state whose requests all succeeded is written atomically to
+tmp/checkpoint_{year}_{state}.parquet (raw API codes, code -> label map in the
+parquet metadata) and recorded in tmp/checkpoint_manifest.json. A resumed run
+loads completed states from disk and only fetches the missing ones.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+TMP_DIR = PROJECT_ROOT / "tmp"
+MANIFEST_PATH = TMP_DIR / "checkpoint_manifest.json"
+
+
+def checkpoint_path(year: int, state_fips: str) -> Path:
+    """Path of the checkpoint file for one (year, state)."""
+    return TMP_DIR / f"checkpoint_{year}_{state_fips}.parquet"
+
+
+def _now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def load_manifest() -> dict:
+    """Load the manifest: {year: {"states": {fips: {...}}, "complete": bool, ...}}."""
+    if not MANIFEST_PATH.exists():
+        return {}
+    return json.loads(MANIFEST_PATH.read_text())
+
+
+def save_manifest(manifest: dict) -> None:
+    """Write the manifest atomically."""
+    TMP_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = MANIFEST_PATH.with_suffix(f".tmp{os.getpid()}")
+    tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def _year_entry(manifest: dict, year: int) -> dict:
+    return manifest.setdefault(str(year), {"states": {}, "complete": False})
+
+
+def write_state(year: int, state_fips: str, df: pd.DataFrame | None, code_to_label: dict[str, str]) -> None:
+    """Atomically checkpoint one completed state and record it in the manifest."""
+    rows = 0
+    if df is not None and not df.empty:
+        TMP_DIR.mkdir(parents=True, exist_ok=True)
+        labels = {c: code_to_label[c] for c in df.columns if c in code_to_label}
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata(
+            {**(table.schema.metadata or {}), b"code_to_label": json.dumps(labels).encode()}
+        )
+        path = checkpoint_path(year, state_fips)
+        tmp_path = path.with_suffix(f".tmp{os.getpid()}")
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+        rows = len(df)
+
+    manifest = load_manifest()
+    _year_entry(manifest, year)["states"][state_fips] = {"rows": rows, "completed_at": _now()}
+    save_manifest(manifest)
+
+
+def completed_states(year: int) -> set[str]:
+    """States with a checkpoint for this year."""
+    return set(load_manifest().get(str(year), {}).get("states", {}))
+
+
+def load_states(year: int, states: set[str]) -> tuple[dict[str, pd.DataFrame | None], dict[str, str]]:
+    """Load checkpointed states. Returns (state -> frame, merged code -> label map)."""
+    state_data: dict[str, pd.DataFrame | None] = {}
+    code_to_label: dict[str, str] = {}
+    for state_fips in states:
+        path = checkpoint_path(year, state_fips)
+        if not path.exists():
+            state_data[state_fips] = None
+            continue
+        table = pq.read_table(path)
+        code_to_label.update(json.loads(table.schema.metadata.get(b"code_to_label", b"{}")))
+        state_data[state_fips] = table.to_pandas()
+    return state_data, code_to_label
+
+
+def mark_year_complete(year: int, rows: int) -> None:
+    """Record that a year's output parquet was written."""
+    manifest = load_manifest()
+    entry = _year_entry(manifest, year)
+    entry.update({"complete": True, "rows": rows, "completed_at": _now(), "error": None})
+    save_manifest(manifest)
+
+
+def mark_year_failed(year: int, error: str) -> None:
+    """Record a year-level error so it shows up in the status summary."""
+    manifest = load_manifest()
+    _year_entry(manifest, year).update({"complete": False, "error": error})
+    save_manifest(manifest)
+
+
+def is_year_complete(year: int) -> bool:
+    """True if the year's output was written by a previous run."""
+    return load_manifest().get(str(year), {}).get("complete", False)
+
+
+def clear_year(year: int) -> None:
+    """Remove all checkpoints for a year (used when not resuming)."""
+    for path in TMP_DIR.glob(f"checkpoint_{year}_*.parquet"):
+        path.unlink()
+    manifest = load_manifest()
+    if manifest.pop(str(year), None) is not None:
+        save_manifest(manifest)
+
+
+def print_status(years: list[int], n_states: int) -> None:
+    """Print per-year progress from the manifest."""
+    manifest = load_manifest()
+    print(f"Checkpoint status ({MANIFEST_PATH})")
+    for year in years:
+        entry = manifest.get(str(year))
+        if entry is None:
+            status = "not started"
+        elif entry.get("complete"):
+            status = f"complete ({entry.get('rows', 0)} rows)"
+        else:
+            status = f"partial ({len(entry.get('states', {}))}/{n_states} states)"
+            if entry.get("error"):
+                status += f" - error: {entry['error']}"
+        print(f"  {year}: {status}")
@@ -0,0 +1,12 @@
+"""
+ACS table groups pulled for every vintage.
+
+Kept apart from pull.py (which needs CENSUS_API_KEY at import) so the update
+planner can fingerprint the group list without an API key.
+"""
+
+# ACS Groups - simplified list for faster testing
+ACS_GROUPS = [
+    "B01001", "B01003", "B02003", "B00001", "B08101", "B07409", "B08303", "B14007",
+    "B15012", "B17026", "B19081", "B19083", "B23020", "B25070", "B25104"
+]
@@ -3,6 +3,8 @@ ACS Data Pull v2 - Census Bureau API Data Pipeline
 Pulls American Community Survey (ACS) 1-year estimates at the place (city) level.
 """
 
+import argparse
+import asyncio
 import os
 import re
 import time
@@ -14,6 +16,10 @@ import pandas as pd
 from dotenv import load_dotenv
 from tqdm import tqdm
 
+from . import cache, checkpoint
+from .groups import ACS_GROUPS
+from .response import ID_CODES, read_response
+
 # Load environment variables
 load_dotenv()
 
@@ -40,25 +46,27 @@ STATE_FIPS = {
     "54": "West Virginia", "55": "Wisconsin", "56": "Wyoming", "72": "Puerto Rico",
 }
 
-# ACS Groups - simplified list for faster testing
-ACS_GROUPS = [
-    "B01001", "B01003", "B02003", "B00001", "B08101", "B07409", "B08303", "B14007",
-    "B15012", "B17026", "B19081", "B19083", "B23020", "B25070", "B25104"
-]
-
 # Project paths
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 TMP_DIR = PROJECT_ROOT / "tmp"
 DATA_RAW_DIR = PROJECT_ROOT / "data" / "acs_raw"
 
+# Sync mode pause after each network request (cache hits don't wait)
+REQUEST_INTERVAL = 0.3
+
+# Async mode defaults: max in-flight requests and sustained requests/second
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RATE = 10.0
+
+# Census API allows at most 50 variables per call; GEO_ID and NAME take two of them
+MAX_VARIABLES_PER_REQUEST = 48
+
 
 def fetch_group_descriptions(year: int) -> dict[str, str]:
     """Fetch group code -> description mapping from Census API."""
     url = f"https://api.census.gov/data/{year}/acs/acs1/groups.json"
     try:
-        response = httpx.get(url, timeout=60)
-        response.raise_for_status()
-        groups = response.json()["groups"]
+        groups = fetch_json(url)["groups"]
         return {g["name"]: g["description"] for g in groups}
     except Exception:
         return {}
@@ -79,90 +87,158 @@ def clean_col_name(col: str) -> str:
     return col
 
 
-def collect_year(year: int) -> pd.DataFrame:
+def fetch_group_variables(year: int, group: str) -> list[str]:
     """
-    Collect all ACS data for one year across all states.
-    Single function with tqdm progress bar for accurate tracking.
+    Fetch a group's variable codes in the API's order (the column order of a group()
+    request), or [] if unavailable. GEO_ID and NAME are left out; every request adds them.
     """
-    DATA_RAW_DIR.mkdir(parents=True, exist_ok=True)
+    url = f"{BASE_URL.format(year=year)}/groups/{group}.json"
+    try:
+        return [code for code in fetch_json(url)["variables"] if code not in ID_CODES]
+    except Exception:
+        return []
 
-    # Fetch group descriptions for readable column names
-    print("Fetching group descriptions...")
-    group_descriptions = fetch_group_descriptions(year)
 
-    # Build list of all (state, group) combinations
-    tasks = [(state_fips, group) for state_fips in STATE_FIPS for group in ACS_GROUPS]
-    total_tasks = len(tasks)
+def plan_requests(group_variables: dict[str, list[str]]) -> list[tuple[str, list[str] | None]]:
+    """
+    Plan one nationwide request per (group, variable chunk).
+    Groups with an unknown variable list fall back to a single group() request.
+    """
+    plan = []
+    for group, variables in group_variables.items():
+        if not variables:
+            plan.append((group, None))
+            continue
+        for i in range(0, len(variables), MAX_VARIABLES_PER_REQUEST):
+            plan.append((group, variables[i:i + MAX_VARIABLES_PER_REQUEST]))
+    return plan
+
 
-    # Store results by state and code->label mapping
-    state_data: dict[str, pd.DataFrame | None] = {s: None for s in STATE_FIPS}
-    code_to_label: dict[str, str] = {}
+def build_request_url(year: int, group: str, variables: list[str] | None, state_fips: str | None = None) -> str:
+    """
+    Build the API URL for one planned request.
+    Without state_fips the request covers places in all states (for=place:*).
+    """
+    get = f"group({group})" if variables is None else ",".join(["GEO_ID", "NAME"] + variables)
+    geo = "for=place:*" if state_fips is None else f"for=place:*&in=state:{state_fips}"
+    return f"{BASE_URL.format(year=year)}?get={get}&{geo}&key={API_KEY}&descriptive=true"
 
-    with tqdm(total=total_tasks, desc=f"Year {year}", unit="req") as pbar:
-        for state_fips, group in tasks:
-            pbar.set_postfix(state=STATE_FIPS[state_fips][:8], group=group)
 
-            # Fetch data with descriptive=true to get both codes and labels
-            url = f"{BASE_URL.format(year=year)}?get=group({group})&for=place:*&in=state:{state_fips}&key={API_KEY}&descriptive=true"
-            df = None
+def _no_rows(response: httpx.Response) -> bool:
+    """404 (group not published for this year/state) or 204/empty body (no places in the state)."""
+    return response.status_code in (204, 404) or (response.is_success and not response.content.strip())
 
-            for attempt in range(3):
-                try:
-                    response = httpx.get(url, timeout=60)
-                    response.raise_for_status()
-                    data = response.json()
-
-                    # With descriptive=true: row 0 = codes, row 1 = labels, row 2+ = data
-                    if data and len(data) >= 3:
-                        codes = data[0]
-                        labels = data[1]
-                        # Build code->label mapping with group description prefix
-                        group_desc = group_descriptions.get(group, group)
-                        for code, label in zip(codes, labels):
-                            if code not in code_to_label:
-                                # Prefix with group description for non-identifier columns
-                                if code not in ("GEO_ID", "NAME", "state", "place"):
-                                    code_to_label[code] = f"{group_desc}__{label}"
-                                else:
-                                    code_to_label[code] = label
-                        # Create DataFrame with codes as columns
-                        df = pd.DataFrame(data[2:], columns=codes)
-                    break
-
-                except httpx.HTTPStatusError as e:
-                    if e.response.status_code == 404:
-                        break  # Group doesn't exist for this year/state
-                except (httpx.RequestError, json.JSONDecodeError):
-                    if attempt < 2:
-                        time.sleep(2 ** attempt)
-
-            # Merge into state data
-            if df is not None and not df.empty:
-                existing_df = state_data[state_fips]
-                if existing_df is None:
-                    state_data[state_fips] = df
-                else:
-                    # Merge on place identifiers (codes)
-                    merge_cols = ["state", "place"]
-                    if "NAME" in df.columns:
-                        merge_cols.append("NAME")
-                    existing_cols = set(existing_df.columns)
-                    new_cols = [c for c in df.columns if c not in existing_cols or c in merge_cols]
-                    state_data[state_fips] = existing_df.merge(
-                        df[new_cols],
-                        on=[c for c in merge_cols if c in df.columns],
-                        how="outer"
-                    )
-
-            time.sleep(0.3)  # Rate limiting
-            pbar.update(1)
 
+def _check_body(body: bytes) -> bytes:
+    """Reject truncated bodies so they are retried rather than cached."""
+    text = body.strip()
+    if not text or text[:1] not in b"[{" or text[-1:] not in b"]}":
+        raise json.JSONDecodeError("Truncated or non-JSON response", text[:80].decode(errors="replace"), 0)
+    return body
+
+
+def fetch_body(url: str) -> bytes | None:
+    """
+    Fetch one raw response body, retrying up to 3 times. Served from the on-disk cache when present;
+    only real network requests are followed by the REQUEST_INTERVAL pause.
+    Returns b"[]" on 404 (group doesn't exist for this year/state) or 204/empty body
+    (state has no places), cached for cache.NOT_FOUND_TTL only, and None after all
+    retries fail.
+    """
+    cached = cache.load(url)
+    if cached is not None:
+        return cached
+    for attempt in range(3):
+        try:
+            response = httpx.get(url, timeout=60)
+            time.sleep(REQUEST_INTERVAL)  # Rate limiting
+            if _no_rows(response):
+                cache.store(url, cache.NOT_FOUND_BODY, not_found=True)
+                return cache.NOT_FOUND_BODY
+            response.raise_for_status()
+            body = _check_body(response.content)
+            cache.store(url, body, response.headers.get("ETag"))
+            return body
+        except httpx.HTTPStatusError:
+            pass
+        except (httpx.RequestError, json.JSONDecodeError):
+            if attempt < 2:
+                time.sleep(2 ** attempt)
+    return None
+
+
+def fetch_json(url: str) -> list | dict | None:
+    """Fetch and decode a small JSON response (group metadata). None after all retries fail."""
+    body = fetch_body(url)
+    return None if body is None else json.loads(body)
+
+
+def parse_group_response(body: bytes | None, group_desc: str) -> tuple[pd.DataFrame, dict[str, str]] | None:
+    """
+    Parse a descriptive=true response body into typed columns indexed by (state, place).
+    The body is decoded straight to Arrow (numeric columns, missing markers as null),
+    so no per-cell Python objects are created for variable columns.
+    Returns (df, code -> label) or None if the response has no data rows.
+    """
+    parsed = read_response(body)
+    if parsed is None:
+        return None
+    codes, labels, table = parsed
+    # Prefix with group description for non-identifier columns
+    code_labels = {}
+    for code, label in zip(codes, labels):
+        if code not in ID_CODES:
+            code_labels[code] = f"{group_desc}__{label}"
+        else:
+            code_labels[code] = label
+    return table.to_pandas().set_index(["state", "place"]), code_labels
+
+
+def assemble_responses(
+    results: list[list[tuple[pd.DataFrame, dict[str, str]] | None]],
+    code_to_label: dict[str, str],
+    states: list[str],
+) -> pd.DataFrame | None:
+    """
+    Join parsed responses into one frame indexed by (state, place).
+    `results` holds one list per planned request: a single nationwide response or the
+    per-state fallback responses. Each chunk is stacked, identifiers are taken once,
+    and all value columns are aligned in a single concat. Rows outside `states` are dropped.
+    """
+    frames = []
+    for parsed_chunk in results:
+        parts = [parsed for parsed in parsed_chunk if parsed is not None]
+        if not parts:
+            continue
+        for _, code_labels in parts:
+            for code, label in code_labels.items():
+                code_to_label.setdefault(code, label)
+        frames.append(pd.concat([df for df, _ in parts]) if len(parts) > 1 else parts[0][0])
+    if not frames:
+        return None
+
+    ids = pd.concat([df[[c for c in ID_CODES if c in df.columns]] for df in frames])
+    ids = ids[~ids.index.duplicated()]
+    seen = set(ids.columns)
+    values = []
+    for df in frames:
+        new_cols = [c for c in df.columns if c not in seen]
+        seen.update(new_cols)
+        values.append(df[new_cols])
+
+    result = pd.concat([ids, *values], axis=1)
+    result = result[result.index.get_level_values("state").isin(states)]
+    return result.sort_index()
+
+
+def finalize_year(frames: list[pd.DataFrame], code_to_label: dict[str, str], year: int) -> pd.DataFrame:
+    """Stack per-state frames (indexed by state, place) and clean ids and column names."""
     # Combine all states
-    all_dfs = [df for df in state_data.values() if df is not None and not df.empty]
+    all_dfs = [df for df in frames if df is not None and not df.empty]
     if not all_dfs:
         return pd.DataFrame()
 
-    result = pd.concat(all_dfs, ignore_index=True)
+    result = pd.concat(all_dfs).sort_index().reset_index()
 
     # Clean the data
     result["year"] = year
@@ -170,23 +246,12 @@ def collect_year(year: int) -> pd.DataFrame:
     # Rename identifier columns
     if "NAME" in result.columns:
         result = result.rename(columns={"NAME": "place_name"})
-    if "state" in result.columns:
-        result = result.rename(columns={"state": "state_fips"})
-    if "place" in result.columns:
-        result["place_fips"] = result["state_fips"] + result["place"]
-        result = result.drop(columns=["place"])
+    result = result.rename(columns={"state": "state_fips"})
+    result["place_fips"] = result["state_fips"] + result["place"]
+    result = result.drop(columns=["place"])
     if "GEO_ID" in result.columns:
         result = result.drop(columns=["GEO_ID"])
 
-    # Replace missing markers and convert to numeric
-    missing_markers = [-666666666, -999999999, -888888888, "-666666666", "-999999999", "-888888888"]
-    result = result.replace(missing_markers, None)
-
-    id_cols = {"place_fips", "place_name", "state_fips", "year"}
-    for col in result.columns:
-        if col not in id_cols:
-            result[col] = pd.to_numeric(result[col], errors="coerce")
-
     # Rename columns from codes to descriptive labels
     result = result.rename(columns=code_to_label)
 
@@ -201,14 +266,298 @@ def collect_year(year: int) -> pd.DataFrame:
     return result
 
 
-def run_single_year(year: int = 2023) -> None:
-    """Run data pull for a single year and save outputs."""
+def _start_year(year: int, resume: bool) -> tuple[list[pd.DataFrame], dict[str, str], list[str]]:
+    """
+    Load checkpointed states when resuming, otherwise clear old checkpoints.
+    Returns (loaded state frames, code -> label, states still to fetch).
+    """
+    if not resume:
+        checkpoint.clear_year(year)
+        return [], {}, list(STATE_FIPS)
+    done = checkpoint.completed_states(year) & set(STATE_FIPS)
+    loaded, code_to_label = checkpoint.load_states(year, done)
+    frames = [df.set_index(["state", "place"]) for df in loaded.values() if df is not None]
+    pending = [s for s in STATE_FIPS if s not in done]
+    if done:
+        print(f"Resuming {year}: {len(done)} states from checkpoints, {len(pending)} to fetch")
+    return frames, code_to_label, pending
+
+
+def _finish_year(
+    year: int,
+    loaded: list[pd.DataFrame],
+    fetched: pd.DataFrame | None,
+    pending: list[str],
+    failed: set[str],
+    code_to_label: dict[str, str],
+) -> tuple[pd.DataFrame, set[str]]:
+    """
+    Checkpoint every fetched state whose requests all succeeded, then build the year.
+    Returns (year frame, states with a failed request).
+    """
+    by_state = dict(iter(fetched.groupby(level="state"))) if fetched is not None else {}
+    for state_fips in pending:
+        if state_fips not in failed:
+            df = by_state.get(state_fips)
+            checkpoint.write_state(year, state_fips, None if df is None else df.reset_index(), code_to_label)
+    if failed:
+        print(f"Incomplete states for {year} (retry with --resume): {sorted(failed)}")
+    return finalize_year([*loaded, fetched], code_to_label, year), failed
+
+
+def collect_year(year: int, resume: bool = False) -> tuple[pd.DataFrame, set[str]]:
+    """
+    Collect all ACS data for one year across all states.
+    Each planned (group, variable chunk) is fetched nationwide in one call; if that
+    call fails, the chunk is re-fetched state by state. Completed states are
+    checkpointed, and with resume=True only states without a checkpoint are fetched.
+    Returns (year frame, states with a failed request).
+    """
+    DATA_RAW_DIR.mkdir(parents=True, exist_ok=True)
+
+    loaded, code_to_label, pending = _start_year(year, resume)
+    if not pending:
+        return _finish_year(year, loaded, None, pending, set(), code_to_label)
+
+    # Fetch group descriptions for readable column names
+    print("Fetching group descriptions...")
+    group_descriptions = fetch_group_descriptions(year)
+    group_variables = {group: fetch_group_variables(year, group) for group in ACS_GROUPS}
+    plan = plan_requests(group_variables)
+
+    # Parsed responses per planned request; a state with any failed request is not checkpointed
+    results: list[list] = []
+    failed: set[str] = set()
+
+    with tqdm(total=len(plan), desc=f"Year {year}", unit="req") as pbar:
+        for group, variables in plan:
+            pbar.set_postfix(group=group)
+            group_desc = group_descriptions.get(group, group)
+
+            # Fetch data with descriptive=true to get both codes and labels
+            data = fetch_body(build_request_url(year, group, variables))
+            pbar.update(1)
+
+            if data is not None:
+                results.append([parse_group_response(data, group_desc)])
+                continue
+
+            # Nationwide call failed or was too large: fall back to per-state requests
+            pbar.total += len(pending)
+            pbar.refresh()
+            parsed_chunk = []
+            for state_fips in pending:
+                pbar.set_postfix(state=STATE_FIPS[state_fips][:8], group=group)
+                data = fetch_body(build_request_url(year, group, variables, state_fips))
+                if data is None:
+                    failed.add(state_fips)
+                parsed_chunk.append(parse_group_response(data, group_desc))
+                pbar.update(1)
+            results.append(parsed_chunk)
+
+    fetched = assemble_responses(results, code_to_label, pending)
+    return _finish_year(year, loaded, fetched, pending, failed, code_to_label)
+
+
+# =============================================================================
+# ASYNC MODE
+# =============================================================================
+
+
+class TokenBucket:
+    """
+    Async token-bucket rate limiter shared by all in-flight requests.
+    Allows bursts of up to `capacity` requests, refilling at `rate` requests/second.
+    """
+
+    def __init__(self, rate: float, capacity: int | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available, then take it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+async def fetch_body_async(
+    client: httpx.AsyncClient, limiter: TokenBucket, url: str
+) -> bytes | None:
+    """Async counterpart of fetch_body with the same cache, retry and 404/204 rules."""
+    cached = await asyncio.to_thread(cache.load, url)
+    if cached is not None:
+        return cached
+    for attempt in range(3):
+        await limiter.acquire()
+        try:
+            response = await client.get(url, timeout=60)
+            if _no_rows(response):
+                await asyncio.to_thread(cache.store, url, cache.NOT_FOUND_BODY, None, True)
+                return cache.NOT_FOUND_BODY
+            response.raise_for_status()
+            body = _check_body(response.content)
+            await asyncio.to_thread(cache.store, url, body, response.headers.get("ETag"))
+            return body
+        except httpx.HTTPStatusError:
+            pass
+        except (httpx.RequestError, json.JSONDecodeError):
+            if attempt < 2:
+                await asyncio.sleep(2 ** attempt)
+    return None
+
+
+async def collect_year_async(
+    year: int,
+    client: httpx.AsyncClient,
+    limiter: TokenBucket,
+    semaphore: asyncio.Semaphore,
+    resume: bool = False,
+) -> tuple[pd.DataFrame, set[str]]:
+    """
+    Collect one year with planned requests issued concurrently on a shared client.
+    Responses are assembled in plan order, so the output is identical to collect_year.
+    """
+    DATA_RAW_DIR.mkdir(parents=True, exist_ok=True)
+
+    loaded, code_to_label, pending = _start_year(year, resume)
+    if not pending:
+        return _finish_year(year, loaded, None, pending, set(), code_to_label)
+
+    print(f"Fetching group descriptions for {year}...")
+    group_descriptions = await asyncio.to_thread(fetch_group_descriptions, year)
+    group_variables = dict(zip(ACS_GROUPS, await asyncio.gather(
+        *(asyncio.to_thread(fetch_group_variables, year, group) for group in ACS_GROUPS)
+    )))
+    plan = plan_requests(group_variables)
+    failed: set[str] = set()
+
+    with tqdm(total=len(plan), desc=f"Year {year}", unit="req") as pbar:
+
+        async def fetch_one(group: str, variables: list[str] | None, state_fips: str | None = None):
+            async with semaphore:
+                url = build_request_url(year, group, variables, state_fips)
+                data = await fetch_body_async(client, limiter, url)
+            pbar.update(1)
+            if data is None and state_fips is not None:
+                failed.add(state_fips)
+            return data
+
+        async def fetch_chunk(group: str, variables: list[str] | None) -> list:
+            group_desc = group_descriptions.get(group, group)
+            data = await fetch_one(group, variables)
+            # Decoding runs in a worker thread so the event loop keeps issuing requests
+            if data is not None:
+                return [await asyncio.to_thread(parse_group_response, data, group_desc)]
+            # Nationwide call failed or was too large: fall back to per-state requests
+            pbar.total += len(pending)
+            pbar.refresh()
+            responses = await asyncio.gather(*(fetch_one(group, variables, s) for s in pending))
+            return await asyncio.gather(
+                *(asyncio.to_thread(parse_group_response, d, group_desc) for d in responses)
+            )
+
+        results = await asyncio.gather(*(fetch_chunk(g, v) for g, v in plan))
+
+    # Results are in plan order, so column order and labels match the sequential path
+    fetched = assemble_responses(results, code_to_label, pending)
+    return _finish_year(year, loaded, fetched, pending, failed, code_to_label)
+
+
+async def collect_years_async(
+    years: list[int],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate: float = DEFAULT_RATE,
+    parallel_years: int = 1,
+    resume: bool = False,
+) -> None:
+    """
+    Collect and save several years using one pooled client, rate limiter and
+    request semaphore. Up to `parallel_years` years are in flight at once.
+    """
+    limiter = TokenBucket(rate)
+    semaphore = asyncio.Semaphore(concurrency)
+    year_semaphore = asyncio.Semaphore(parallel_years)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+
+        async def run_year(year: int) -> None:
+            async with year_semaphore:
+                try:
+                    df, failed = await collect_year_async(year, client, limiter, semaphore, resume)
+                    save_year(df, year, failed)
+                except Exception as e:
+                    print(f"Error for year {year}: {e}")
+                    checkpoint.mark_year_failed(year, str(e))
+
+        await asyncio.gather(*(run_year(year) for year in years))
+
+
+async def _collect_single_year_async(
+    year: int, concurrency: int, rate: float, resume: bool = False
+) -> tuple[pd.DataFrame, set[str]]:
+    """Collect one year on a fresh pooled client (used by run_single_year)."""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        return await collect_year_async(year, client, TokenBucket(rate), asyncio.Semaphore(concurrency), resume)
+
+
+def _mark_incomplete(year: int, failed: set[str]) -> None:
+    """Record a year with failed states; its completed states stay checkpointed for --resume."""
+    checkpoint.mark_year_failed(year, f"failed states: {', '.join(sorted(failed))}")
+    print(f"Not saving {year}: {len(failed)} states failed (retry with --resume)")
+
+
+def save_year(df: pd.DataFrame, year: int, failed: set[str] | None = None) -> Path | None:
+    """
+    Save a collected year to data/acs_raw and mark it complete in the checkpoint manifest.
+    A year with failed states is not saved; it is marked failed instead.
+    """
+    if failed:
+        _mark_incomplete(year, failed)
+        return None
+    if df.empty:
+        print(f"No data for year {year}")
+        return None
+    output_path = DATA_RAW_DIR / f"acs_{year}.parquet"
+    df.to_parquet(output_path, index=False)
+    checkpoint.mark_year_complete(year, len(df))
+    print(f"Saved {len(df)} rows to {output_path}")
+    return output_path
+
+
+def run_single_year(
+    year: int = 2023,
+    concurrency: int | None = None,
+    rate: float = DEFAULT_RATE,
+    resume: bool = False,
+) -> None:
+    """
+    Run data pull for a single year and save outputs.
+    If concurrency is set, uses the async engine. With resume, checkpointed states are reused.
+    """
     print(f"\nCollecting ACS data for year {year}")
     print(f"States: {len(STATE_FIPS)}, Groups: {len(ACS_GROUPS)}")
-    print(f"Total API calls: {len(STATE_FIPS) * len(ACS_GROUPS)}\n")
+    print("Requests: one nationwide call per group variable chunk (per-state fallback on failure)\n")
 
-    df = collect_year(year)
+    if concurrency:
+        df, failed = asyncio.run(_collect_single_year_async(year, concurrency, rate, resume))
+    else:
+        df, failed = collect_year(year, resume)
 
+    if failed:
+        _mark_incomplete(year, failed)
+        return
     if df.empty:
         print("No data collected.")
         return
@@ -216,6 +565,7 @@ def run_single_year(year: int = 2023) -> None:
     # Save outputs
     output_path = DATA_RAW_DIR / f"acs_{year}.parquet"
     df.to_parquet(output_path, index=False)
+    checkpoint.mark_year_complete(year, len(df))
 
     csv_path = DATA_RAW_DIR / f"acs_{year}.csv"
     df.to_csv(csv_path, index=False)
@@ -237,28 +587,46 @@ def run_single_year(year: int = 2023) -> None:
         print(f"  {'Y' if found else 'N'} {city}")
 
 
-def run_all_years(start: int = 2009, end: int = 2024) -> None:
-    """Run data pull for multiple years."""
+def run_all_years(
+    start: int = 2009,
+    end: int = 2024,
+    concurrency: int | None = None,
+    rate: float = DEFAULT_RATE,
+    parallel_years: int = 1,
+    resume: bool = False,
+) -> None:
+    """
+    Run data pull for multiple years.
+    If concurrency is set, uses the async engine with up to `parallel_years` years in flight.
+    With resume, finished years are skipped and partial years continue from their checkpoints.
+    """
     print(f"\nCollecting ACS data for years {start}-{end}")
     print(f"States: {len(STATE_FIPS)}, Groups: {len(ACS_GROUPS)}")
 
     DATA_RAW_DIR.mkdir(parents=True, exist_ok=True)
 
-    for year in range(start, end + 1):
-        print(f"\n{'#'*60}")
-        print(f"YEAR {year}")
-        print(f"{'#'*60}")
+    years = list(range(start, end + 1))
+    if resume:
+        done = [y for y in years if checkpoint.is_year_complete(y) and (DATA_RAW_DIR / f"acs_{y}.parquet").exists()]
+        if done:
+            print(f"Skipping completed years: {done}")
+        years = [y for y in years if y not in done]
 
-        try:
-            df = collect_year(year)
-            if not df.empty:
-                output_path = DATA_RAW_DIR / f"acs_{year}.parquet"
-                df.to_parquet(output_path, index=False)
-                print(f"Saved {len(df)} rows to {output_path}")
-            else:
-                print(f"No data for year {year}")
-        except Exception as e:
-            print(f"Error for year {year}: {e}")
+    if concurrency:
+        print(f"Async mode: concurrency={concurrency}, rate={rate}/s, parallel years={parallel_years}")
+        asyncio.run(collect_years_async(years, concurrency, rate, parallel_years, resume))
+    else:
+        for year in years:
+            print(f"\n{'#'*60}")
+            print(f"YEAR {year}")
+            print(f"{'#'*60}")
+
+            try:
+                df, failed = collect_year(year, resume)
+                save_year(df, year, failed)
+            except Exception as e:
+                print(f"Error for year {year}: {e}")
+                checkpoint.mark_year_failed(year, str(e))
 
     print(f"\n{'='*60}")
     print("DONE - All years complete")
@@ -266,18 +634,41 @@ def run_all_years(start: int = 2009, end: int = 2024) -> None:
 
 
 if __name__ == "__main__":
-    import sys
-
-    if len(sys.argv) > 1:
-        if sys.argv[1] == "--all":
-            start = int(sys.argv[2]) if len(sys.argv) > 2 else 2009
-            end = int(sys.argv[3]) if len(sys.argv) > 3 else 2024
-            run_all_years(start, end)
-        else:
-            year = int(sys.argv[1])
-            run_single_year(year)
+    parser = argparse.ArgumentParser(description="Pull ACS 1-year place-level data.")
+    parser.add_argument("year", nargs="?", type=int, help="Single year to pull")
+    parser.add_argument("--all", nargs="*", type=int, metavar="YEAR", help="All years, or a START END range")
+    parser.add_argument("--concurrency", type=int, help="Use async mode with this many in-flight requests")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="Async mode requests/second")
+    parser.add_argument("--parallel-years", type=int, default=1, help="Async mode years in flight")
+    parser.add_argument("--cache-info", action="store_true", help="Print response cache size and exit")
+    parser.add_argument("--invalidate-cache", nargs="+", type=int, metavar="YEAR", help="Drop cached responses for years")
+    parser.add_argument("--resume", action="store_true", help="Skip finished years and reuse state checkpoints")
+    parser.add_argument("--status", action="store_true", help="Print checkpoint status for the year range and exit")
+    args = parser.parse_args()
+
+    if args.status:
+        years = [args.year] if args.year is not None else list(range(2009, 2025))
+        if args.all:
+            years = list(range(args.all[0], (args.all[1] if len(args.all) > 1 else 2024) + 1))
+        checkpoint.print_status(years, len(STATE_FIPS))
+    elif args.cache_info:
+        cache.print_cache_summary()
+    elif args.invalidate_cache:
+        for year in args.invalidate_cache:
+            print(f"Year {year}: removed {cache.invalidate_year(year)} cached responses")
+    elif args.all is not None:
+        start = args.all[0] if len(args.all) > 0 else 2009
+        end = args.all[1] if len(args.all) > 1 else 2024
+        run_all_years(start, end, args.concurrency, args.rate, args.parallel_years, args.resume)
+    elif args.year is not None:
+        run_single_year(args.year, args.concurrency, args.rate, args.resume)
     else:
         print("Usage:")
         print("  uv run python -m src.acs_pull.pull <year>       # Single year")
         print("  uv run python -m src.acs_pull.pull --all        # All years (2009-2024)")
         print("  uv run python -m src.acs_pull.pull --all 2015 2020  # Custom range")
+        print("  uv run python -m src.acs_pull.pull --all --concurrency 8 --parallel-years 2  # Async mode")
+        print("  uv run python -m src.acs_pull.pull --all --resume       # Continue an interrupted pull")
+        print("  uv run python -m src.acs_pull.pull --all --status       # Checkpoint status per year")
+        print("  uv run python -m src.acs_pull.pull --cache-info            # Response cache size")
+        print("  uv run python -m src.acs_pull.pull --invalidate-cache 2024 # Re-download a year")
@@ -0,0 +1,102 @@
+"""
+Decode Census API JSON responses straight into pyarrow tables.
+
+A data response is a JSON array of rows: codes, labels (descriptive=true), then
+data rows of quoted strings. Instead of json.loads building a Python list per row
+and a str per cell, the row separators are rewritten in one pass so the body reads
+as CSV, and pyarrow's CSV reader builds the columns. Variable columns are cast to
+int64/float64 with the Census missing markers mapped to null.
+"""
+
+import io
+import json
+import re
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
+ID_CODES = ("GEO_ID", "NAME", "state", "place")
+MISSING_MARKERS = [-666666666, -999999999, -888888888]
+
+_ROW_SEP = re.compile(rb"\]\s*,\s*\[")
+# Whitespace before a value; an unescaped quote can't occur inside a JSON string
+_FIELD_SPACE = re.compile(rb',\s+(?="|null(?:,|\n|$))')
+_NUMBER = r"^[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?$"
+
+
+def _split_rows(body: bytes) -> list[bytes] | None:
+    """Split off the code and label rows; the third item is every data row as CSV lines."""
+    text = body.strip()
+    if not (text.startswith(b"[[") and text.endswith(b"]]")):
+        return None
+    # Header rows are small: split them off and keep the data rows as one buffer
+    parts = _ROW_SEP.split(text[2:-2], maxsplit=2)
+    if len(parts) < 3:
+        return None
+    parts[2] = _FIELD_SPACE.sub(b",", _ROW_SEP.sub(b"\n", parts[2]))
+    return parts
+
+
+def _read_rows(rows: bytes, codes: list[str]) -> pa.Table:
+    """Read the CSV-shaped data rows with every column as a string."""
+    return pa_csv.read_csv(
+        io.BytesIO(rows),
+        read_options=pa_csv.ReadOptions(column_names=codes),
+        parse_options=pa_csv.ParseOptions(escape_char="\\", double_quote=False, newlines_in_values=False),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={code: pa.string() for code in codes},
+            null_values=["null"],
+            strings_can_be_null=True,
+            quoted_strings_can_be_null=False,
+        ),
+    )
+
+
+def _read_rows_json(body: bytes) -> tuple[list[str], list[str], pa.Table]:
+    """Fallback for bodies with JSON escapes the CSV reader can't decode."""
+    data = json.loads(body)
+    columns = list(zip(*data[2:]))
+    arrays = [
+        pa.array([None if v is None else str(v) for v in col], type=pa.string())
+        for col in columns
+    ]
+    return data[0], data[1], pa.Table.from_arrays(arrays, names=data[0])
+
+
+def to_numeric(arr: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Cast a string column to int64 (or float64), nulling non-numeric values and missing markers."""
+    for target in (pa.int64(), pa.float64()):
+        try:
+            values = arr.cast(target)
+            break
+        except pa.ArrowInvalid:
+            continue
+    else:
+        # Annotation columns mix numbers and flags like "*****": keep only the numbers
+        trimmed = pc.utf8_trim_whitespace(arr)
+        valid = pc.match_substring_regex(trimmed, _NUMBER)
+        values = pc.if_else(valid, trimmed, pa.scalar(None, pa.string())).cast(pa.float64())
+    missing = pc.is_in(values, value_set=pa.array(MISSING_MARKERS, type=values.type))
+    return pc.if_else(missing, pa.scalar(None, values.type), values)
+
+
+def read_response(body: bytes | None) -> tuple[list[str], list[str], pa.Table] | None:
+    """
+    Decode a descriptive=true response body.
+    Returns (codes, labels, table) with identifier columns as strings and variable
+    columns numeric, or None if the response has no data rows.
+    """
+    if not body:
+        return None
+    parts = _split_rows(body)
+    if parts is None:
+        return None
+    if b"\\" in parts[2]:
+        codes, labels, table = _read_rows_json(body)
+    else:
+        codes = json.loads(b"[" + parts[0] + b"]")
+        labels = json.loads(b"[" + parts[1] + b"]")
+        table = _read_rows(parts[2], codes)
+    columns = [col if code in ID_CODES else to_numeric(col) for code, col in zip(codes, table.columns)]
+    return codes, labels, pa.Table.from_arrays(columns, names=codes)
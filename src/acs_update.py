@@ -0,0 +1,317 @@
+"""
+ACS Incremental Update
+
+Brings data/acs_raw and data/acs_agg up to date without redoing finished years.
+- Manifest: data/acs_manifest.json, one entry per year with the SHA-256, row count
+  and schema fingerprint of the raw and aggregated parquet files
+- A year is pulled when its raw file is missing or was pulled with a different
+  ACS group list
+- A year is aggregated when its output is missing, was built from a different raw
+  file or aggregation code, or was modified since it was recorded
+
+Raw files that predate the manifest are adopted as-is; their aggregates are rebuilt
+once so the manifest can vouch for them. The panel store is rebuilt after any update.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import pyarrow.parquet as pq
+
+from . import acs_aggregation
+from .acs_aggregation import AGG_DATA_DIR, RAW_DATA_DIR
+from .acs_panel import build_panel
+from .acs_pull.groups import ACS_GROUPS
+
+MANIFEST_PATH = AGG_DATA_DIR.parent / "acs_manifest.json"
+AGGREGATION_SOURCES = [Path(acs_aggregation.__file__), acs_aggregation.SPEC_PATH]
+
+
+def _now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def acs_years(end: int) -> list[int]:
+    """ACS 1-year vintages from 2009 through `end` (2020 was never released)."""
+    return [y for y in range(2009, end + 1) if y != 2020]
+
+
+def raw_path(year: int) -> Path:
+    return RAW_DATA_DIR / f"acs_{year}.parquet"
+
+
+def agg_path(year: int) -> Path:
+    return AGG_DATA_DIR / f"acs_{year}.parquet"
+
+
+# =============================================================================
+# FINGERPRINTS
+# =============================================================================
+
+
+def file_sha256(path: Path, previous: dict | None = None) -> str:
+    """
+    SHA-256 of a file's bytes. If size and mtime match a previous record, its hash is
+    reused so unchanged files are not re-read on every run.
+    """
+    stat = path.stat()
+    if previous and previous.get("size") == stat.st_size and previous.get("mtime_ns") == stat.st_mtime_ns:
+        return previous["sha256"]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def schema_fingerprint(path: Path) -> str:
+    """Hash of column names and types, read from the parquet footer only."""
+    schema = pq.read_schema(path)
+    spec = "\n".join(f"{field.name}:{field.type}" for field in schema)
+    return hashlib.sha256(spec.encode()).hexdigest()[:16]
+
+
+def describe_file(path: Path, previous: dict | None = None) -> dict:
+    """Hash, row count (from parquet metadata), schema fingerprint and stat of a parquet file."""
+    stat = path.stat()
+    return {
+        "sha256": file_sha256(path, previous),
+        "rows": pq.read_metadata(path).num_rows,
+        "schema": schema_fingerprint(path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "recorded_at": _now(),
+    }
+
+
+def pull_fingerprint() -> str:
+    """Hash of the ACS group list a raw file is pulled with."""
+    return hashlib.sha256(",".join(ACS_GROUPS).encode()).hexdigest()[:16]
+
+
+def aggregation_fingerprint() -> str:
+    """Hash of the aggregation module and spec; editing either marks every aggregate stale."""
+    digest = hashlib.sha256()
+    for path in AGGREGATION_SOURCES:
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+# =============================================================================
+# MANIFEST
+# =============================================================================
+
+
+def load_manifest() -> dict:
+    """Load the manifest: {year: {"raw": {...}, "agg": {...}}}."""
+    if not MANIFEST_PATH.exists():
+        return {}
+    return json.loads(MANIFEST_PATH.read_text())
+
+
+def save_manifest(manifest: dict) -> None:
+    """Write the manifest atomically."""
+    MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = MANIFEST_PATH.with_suffix(f".tmp{os.getpid()}")
+    tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def record_raw(manifest: dict, year: int, pull_config: str) -> None:
+    """Record the current raw file for a year."""
+    entry = manifest.setdefault(str(year), {})
+    entry["raw"] = {**describe_file(raw_path(year), entry.get("raw")), "pull_config": pull_config}
+
+
+def record_agg(manifest: dict, year: int, code: str) -> None:
+    """Record the current aggregate for a year and the raw file it was built from."""
+    entry = manifest.setdefault(str(year), {})
+    entry["agg"] = {
+        **describe_file(agg_path(year), entry.get("agg")),
+        "source_sha256": entry["raw"]["sha256"],
+        "code": code,
+    }
+
+
+# =============================================================================
+# PLANNING
+# =============================================================================
+
+
+def raw_status(manifest: dict, year: int, pull_config: str) -> str | None:
+    """Reason the raw file needs pulling, or None if it is current."""
+    path = raw_path(year)
+    if not path.exists():
+        return "raw missing"
+    recorded = manifest.get(str(year), {}).get("raw")
+    if recorded is not None and recorded.get("pull_config") != pull_config:
+        return "pulled with a different group list"
+    return None
+
+
+def agg_status(manifest: dict, year: int, code: str) -> str | None:
+    """Reason the aggregate needs rebuilding, or None if it is current. Assumes the raw file is current."""
+    path = agg_path(year)
+    if not path.exists():
+        return "aggregate missing"
+    entry = manifest.get(str(year), {})
+    recorded = entry.get("agg")
+    if recorded is None:
+        return "aggregate not in manifest"
+    raw_sha = file_sha256(raw_path(year), entry.get("raw"))
+    if recorded.get("source_sha256") != raw_sha:
+        return "raw file changed"
+    if recorded.get("code") != code:
+        return "aggregation code changed"
+    if file_sha256(path, recorded) != recorded["sha256"]:
+        return "aggregate modified"
+    if recorded["rows"] != pq.read_metadata(raw_path(year)).num_rows:
+        return "row count mismatch"
+    return None
+
+
+def plan_update(years: list[int], force: set[int] | None = None) -> tuple[dict[int, str], dict[int, str]]:
+    """
+    Decide which years to pull and which to aggregate.
+    Returns ({year: reason} to pull, {year: reason} to aggregate).
+    """
+    force = force or set()
+    manifest = load_manifest()
+    pull_config = pull_fingerprint()
+    code = aggregation_fingerprint()
+    to_pull: dict[int, str] = {}
+    to_aggregate: dict[int, str] = {}
+    for year in years:
+        reason = "forced" if year in force else raw_status(manifest, year, pull_config)
+        if reason is not None:
+            to_pull[year] = reason
+            to_aggregate[year] = "new raw data"
+            continue
+        reason = agg_status(manifest, year, code)
+        if reason is not None:
+            to_aggregate[year] = reason
+    return to_pull, to_aggregate
+
+
+# =============================================================================
+# UPDATE
+# =============================================================================
+
+
+def pull_years(years: list[int], concurrency: int | None, rate: float | None, parallel_years: int) -> None:
+    """Pull raw parquet files for the given years (async engine if concurrency is set)."""
+    from .acs_pull import pull
+
+    if concurrency:
+        asyncio.run(pull.collect_years_async(years, concurrency, rate or pull.DEFAULT_RATE, parallel_years))
+        return
+    for year in years:
+        try:
+            df, failed = pull.collect_year(year)
+            pull.save_year(df, year, failed)
+        except Exception as e:
+            print(f"Error pulling {year}: {e}")
+
+
+def run_update(
+    years: list[int],
+    concurrency: int | None = None,
+    rate: float | None = None,
+    parallel_years: int = 1,
+    force: set[int] | None = None,
+    dry_run: bool = False,
+) -> dict[int, str]:
+    """
+    Pull and aggregate only the years that are missing or stale, recording each in the manifest.
+    Returns {year: outcome} for every year that needed work.
+    """
+    to_pull, to_aggregate = plan_update(years, force)
+    print(f"Years checked: {len(years)}, to pull: {len(to_pull)}, to aggregate: {len(to_aggregate)}")
+    for year in years:
+        reason = to_pull.get(year) or to_aggregate.get(year)
+        if reason:
+            print(f"  {year}: {'pull + aggregate' if year in to_pull else 'aggregate'} ({reason})")
+    if dry_run or not to_aggregate:
+        if not to_aggregate:
+            print("Everything is up to date.")
+        return {}
+
+    manifest = load_manifest()
+    outcomes: dict[int, str] = {}
+    pull_config = pull_fingerprint()
+
+    if to_pull:
+        before = {y: raw_path(y).stat().st_mtime_ns if raw_path(y).exists() else None for y in to_pull}
+        pull_years(sorted(to_pull), concurrency, rate, parallel_years)
+        for year in sorted(to_pull):
+            path = raw_path(year)
+            if not path.exists() or path.stat().st_mtime_ns == before[year]:
+                outcomes[year] = "pull failed"
+                to_aggregate.pop(year, None)
+                continue
+            record_raw(manifest, year, pull_config)
+            save_manifest(manifest)
+
+    code = aggregation_fingerprint()
+    for year in sorted(to_aggregate):
+        if year not in to_pull:
+            # Re-record the raw file this aggregate is built from; files that predate
+            # the manifest are adopted with the current group list
+            recorded = manifest.get(str(year), {}).get("raw", {})
+            record_raw(manifest, year, recorded.get("pull_config", pull_config))
+        try:
+            df = acs_aggregation.aggregate_year(year, verbose=False)
+            acs_aggregation.save_aggregated(df, year)
+        except Exception as e:
+            outcomes[year] = f"aggregation failed: {e}"
+            continue
+        record_agg(manifest, year, code)
+        save_manifest(manifest)
+        outcomes[year] = "updated"
+
+    print("\nUpdate results:")
+    for year, outcome in sorted(outcomes.items()):
+        print(f"  {year}: {outcome}")
+
+    # Keep the consolidated panel in step with the aggregates
+    if "updated" in outcomes.values():
+        build_panel([y for y in years if agg_path(y).exists()])
+    return outcomes
+
+
+def print_status(years: list[int]) -> None:
+    """Print what the manifest knows about each year and whether it is current."""
+    manifest = load_manifest()
+    to_pull, to_aggregate = plan_update(years)
+    print(f"ACS manifest ({MANIFEST_PATH})")
+    for year in years:
+        entry = manifest.get(str(year), {})
+        raw = entry.get("raw")
+        agg = entry.get("agg")
+        raw_info = f"raw {raw['rows']} rows [{raw['schema']}]" if raw else "raw not recorded"
+        agg_info = f"agg {agg['rows']} rows [{agg['schema']}]" if agg else "agg not recorded"
+        state = to_pull.get(year) or to_aggregate.get(year) or "current"
+        print(f"  {year}: {raw_info}, {agg_info} - {state}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pull and aggregate only missing or stale ACS years.")
+    parser.add_argument("--through", type=int, default=max(acs_aggregation.YEARS), help="Last vintage to include")
+    parser.add_argument("--force", nargs="+", type=int, default=[], metavar="YEAR", help="Re-pull these years")
+    parser.add_argument("--dry-run", action="store_true", help="Show the plan without pulling or aggregating")
+    parser.add_argument("--status", action="store_true", help="Print manifest status and exit")
+    parser.add_argument("--concurrency", type=int, help="Pull with the async engine and this many in-flight requests")
+    parser.add_argument("--rate", type=float, help="Async mode requests/second")
+    parser.add_argument("--parallel-years", type=int, default=1, help="Async mode years in flight")
+    args = parser.parse_args()
+
+    years = acs_years(args.through)
+    if args.status:
+        print_status(years)
+    else:
+        run_update(years, args.concurrency, args.rate, args.parallel_years, set(args.force), args.dry_run)
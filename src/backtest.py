@@ -0,0 +1,251 @@
+"""
+Rolling-Origin Backtest
+
+Evaluates forecasting models on (City, State, Year) panels by training on past years
+and testing on the next one, the time-series CV of baselines.ipynb / levels_vs_growth.ipynb.
+- Folds: expanding (all years before the test year) or sliding (the last `window` years)
+- The design matrix (features + fixed-effect dummies) is built once for the whole panel;
+  each fold's train/test matrices and fitted scaler are built once and cached, then
+  shared by every model
+- Folds run in a process pool with workers > 1; each worker receives a fold's
+  matrices once and fits every model on them
+- Results: one tidy row per (model, fold) with R², RMSE and MAE
+- absorb=True removes fixed effects by the within transformation (fixed_effects.py)
+  instead of dummy columns; needed for city effects
+
+Usage:
+    bt = Backtest(panel_df, ["y_lag1", "pop_yoy", "home_yoy"], fixed_effects="state")
+    metrics = bt.run({"ols": LinearRegression, "ridge": partial(Ridge, alpha=10.0)}, test_years=range(2020, 2025))
+
+Model factories are called with no arguments and must return an object with
+fit(X, y) and predict(X). With workers > 1 they must be picklable (classes,
+functools.partial or module-level functions, not lambdas).
+"""
+
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.preprocessing import StandardScaler
+
+from .fixed_effects import absorb as absorb_effects, effect_values, group_codes
+
+KEY_COLS = ["City", "State", "Year"]
+MIN_TRAIN = 50
+MIN_TEST = 10
+
+
+@dataclass(frozen=True)
+class Fold:
+    test_year: int
+    train_years: tuple[int, ...]
+
+    @property
+    def label(self) -> str:
+        return f"{self.train_years[0]}-{self.train_years[-1]}"
+
+
+@dataclass
+class FoldData:
+    """
+    Everything a model needs for one fold; built once and shared by all models.
+    With absorbed fixed effects, X_train/y_train are within-transformed, X_test is
+    adjusted by the training effects, and extras["offset"] holds the effects to add
+    back to the test predictions.
+    """
+
+    fold: Fold
+    X_train: np.ndarray
+    y_train: np.ndarray
+    X_test: np.ndarray
+    y_test: np.ndarray
+    test_keys: pd.DataFrame
+    scaler: StandardScaler | None = None
+    extras: dict = field(default_factory=dict)
+
+
+def rolling_origin_folds(years: list[int], test_years: list[int], window: int | None = None) -> list[Fold]:
+    """
+    One fold per test year: train on every earlier panel year (expanding), or on the
+    `window` years right before it (sliding). Test years with no earlier data are skipped.
+    """
+    years = sorted(set(years))
+    folds = []
+    for test_year in test_years:
+        train = [y for y in years if y < test_year]
+        if window is not None:
+            train = train[-window:]
+        if train and test_year in years:
+            folds.append(Fold(test_year, tuple(train)))
+    return folds
+
+
+def design_matrix(
+    panel: pd.DataFrame,
+    feature_cols: list[str],
+    fixed_effects: str | None = "state",
+) -> tuple[np.ndarray, list[str]]:
+    """Feature columns plus state and/or year dummies (drop_first), as a float64 array."""
+    if fixed_effects not in (None, "state", "year", "both"):
+        raise ValueError(f"fixed_effects={fixed_effects!r} needs absorb=True (no dummy columns)")
+    blocks = [panel[feature_cols].astype(float)]
+    if fixed_effects in ("state", "both"):
+        blocks.append(pd.get_dummies(panel["State"], prefix="state", drop_first=True, dtype=float))
+    if fixed_effects in ("year", "both"):
+        blocks.append(pd.get_dummies(panel["Year"], prefix="year", drop_first=True, dtype=float))
+    X = pd.concat(blocks, axis=1)
+    return X.to_numpy(dtype=float), list(X.columns)
+
+
+def regression_metrics(y_true: np.ndarray, y_pred: np.ndarray) -> dict[str, float]:
+    return {
+        "r2": r2_score(y_true, y_pred),
+        "rmse": float(np.sqrt(mean_squared_error(y_true, y_pred))),
+        "mae": mean_absolute_error(y_true, y_pred),
+    }
+
+
+def _run_fold(data: FoldData, models: dict[str, Callable], keep_predictions: bool) -> tuple[list[dict], list]:
+    """Fit every model on one fold. Runs in a worker process when workers > 1."""
+    rows, predictions = [], []
+    for name, factory in models.items():
+        row = {
+            "model": name,
+            "test_year": data.fold.test_year,
+            "train_years": data.fold.label,
+            "n_train": len(data.y_train),
+            "n_test": len(data.y_test),
+        }
+        try:
+            start = time.perf_counter()
+            model = factory()
+            model.fit(data.X_train, data.y_train)
+            y_pred = np.asarray(model.predict(data.X_test), dtype=float).reshape(-1) + data.extras.get("offset", 0.0)
+            row.update(regression_metrics(data.y_test, y_pred))
+            row["fit_seconds"] = time.perf_counter() - start
+            if keep_predictions:
+                predictions.append((name, y_pred))
+        except Exception as e:
+            row["error"] = f"{type(e).__name__}: {e}"
+        rows.append(row)
+    return rows, predictions
+
+
+class Backtest:
+    """
+    Rolling-origin evaluation of many models on one panel.
+    Fold data is cached on the instance, so later run() calls with other models reuse it.
+    """
+
+    def __init__(
+        self,
+        panel: pd.DataFrame,
+        feature_cols: list[str],
+        target: str = "y",
+        fixed_effects: str | None = "state",
+        scale: bool = True,
+        absorb: bool = False,
+    ):
+        self.panel = panel.reset_index(drop=True)
+        self.feature_cols = list(feature_cols)
+        self.target = target
+        self.fixed_effects = fixed_effects
+        self.scale = scale
+        self.absorb = absorb and fixed_effects is not None
+        self.X, self.feature_names = design_matrix(
+            self.panel, self.feature_cols, None if self.absorb else fixed_effects
+        )
+        self.codes = group_codes(self.panel, fixed_effects) if self.absorb else []
+        self.y = self.panel[target].to_numpy(dtype=float)
+        self.years = self.panel["Year"].to_numpy()
+        self._folds: dict[Fold, FoldData | None] = {}
+        self.predictions: pd.DataFrame | None = None
+
+    def fold_data(self, fold: Fold) -> FoldData | None:
+        """Train/test matrices for a fold (None if the fold is too small), built on first use."""
+        if fold not in self._folds:
+            train = np.isin(self.years, fold.train_years)
+            test = self.years == fold.test_year
+            if train.sum() < MIN_TRAIN or test.sum() < MIN_TEST:
+                self._folds[fold] = None
+            else:
+                X_train, X_test = self.X[train], self.X[test]
+                y_train = self.y[train]
+                extras = {}
+                if self.absorb:
+                    X_train, y_train, X_test, extras["offset"] = self._absorb(train, test)
+                scaler = None
+                if self.scale:
+                    scaler = StandardScaler().fit(X_train)
+                    X_train, X_test = scaler.transform(X_train), scaler.transform(X_test)
+                self._folds[fold] = FoldData(
+                    fold,
+                    X_train,
+                    y_train,
+                    X_test,
+                    self.y[test],
+                    self.panel.loc[test, KEY_COLS].reset_index(drop=True),
+                    scaler,
+                    extras,
+                )
+        return self._folds[fold]
+
+    def _absorb(self, train: np.ndarray, test: np.ndarray) -> tuple[np.ndarray, ...]:
+        """Within-transform a fold's training rows; adjust its test rows by the training effects."""
+        n_groups = [int(c.max()) + 1 for c in self.codes]
+        stacked = np.column_stack([self.X[train], self.y[train]])
+        within, effects = absorb_effects(stacked, [c[train] for c in self.codes], n_groups)
+        adjust = effect_values(effects, [c[test] for c in self.codes])
+        return within[:, :-1], within[:, -1], self.X[test] - adjust[:, :-1], adjust[:, -1]
+
+    def run(
+        self,
+        models: dict[str, Callable],
+        test_years: list[int],
+        window: int | None = None,
+        workers: int = 1,
+        keep_predictions: bool = False,
+    ) -> pd.DataFrame:
+        """
+        Evaluate each model on each fold. Returns one row per (model, fold), in fold
+        then model order for any worker count. A model that fails on a fold gets an
+        "error" entry instead of metrics. With keep_predictions, test-set predictions
+        are stored in self.predictions.
+        """
+        folds = rolling_origin_folds(list(self.years), list(test_years), window)
+        prepared = [data for data in (self.fold_data(fold) for fold in folds) if data is not None]
+
+        outcomes = {}
+        if workers > 1 and len(prepared) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(prepared))) as pool:
+                futures = {pool.submit(_run_fold, data, models, keep_predictions): data.fold for data in prepared}
+                for future in as_completed(futures):
+                    outcomes[futures[future]] = future.result()
+        else:
+            for data in prepared:
+                outcomes[data.fold] = _run_fold(data, models, keep_predictions)
+
+        rows = []
+        prediction_frames = []
+        for data in prepared:
+            fold_rows, fold_predictions = outcomes[data.fold]
+            rows.extend(fold_rows)
+            for name, y_pred in fold_predictions:
+                frame = data.test_keys.copy()
+                frame["model"] = name
+                frame["y"] = data.y_test
+                frame["y_pred"] = y_pred
+                prediction_frames.append(frame)
+        if keep_predictions:
+            self.predictions = pd.concat(prediction_frames, ignore_index=True) if prediction_frames else None
+        return pd.DataFrame(rows)
+
+
+def summarize(metrics: pd.DataFrame) -> pd.DataFrame:
+    """Mean and std of each metric per model across folds."""
+    value_cols = [c for c in ("r2", "rmse", "mae") if c in metrics.columns]
+    return metrics.groupby("model", sort=False)[value_cols].agg(["mean", "std"])
@@ -0,0 +1,251 @@
+"""
+County Business Patterns Sector Growth
+
+Builds the sector establishment-growth features of the regression tables from the
+yearly CBP extracts.
+- Input: regression_data/census_business_patterns_{year}.csv (NAME, SECTOR, ESTAB per
+  place and 2-digit NAICS sector), read with categorical NAME/SECTOR
+- All years go into one (places, sectors, years) ESTAB array; YoY growth is one array
+  division and a lag is an index offset along the year axis
+- Output: census_business_patterns_yoy.csv (City, State, Year, one growth column per
+  sector; rows with no sector growth dropped) and the sector lag columns of
+  regression_data_final_{rent,population,home_values}.csv (missing growth -> 0)
+- Parsed years are cached in data/cbp_cache with each CSV's size and mtime, so adding
+  a year parses only that file and the rebuild is array work
+- Outputs are written to data/cbp_cache unless an output directory is given; the
+  tracked tables in regression_data are only replaced by passing it explicitly
+
+The final tables' rows, outcome and home value growth columns come from other
+sources; a rebuild keeps them and refreshes only the sector columns. add_sector_lags()
+attaches the same columns to any City/State/Year panel (e.g. rows for a new year).
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .place_registry import split_place_name
+
+DATA_DIR = Path("regression_data")
+CACHE_DIR = Path("data/cbp_cache")
+CACHE_MANIFEST = CACHE_DIR / "_manifest.json"
+FILE_PATTERN = re.compile(r"census_business_patterns_(\d{4})\.csv$")
+YOY_FILE = "census_business_patterns_yoy.csv"
+
+# 2-digit NAICS sector code -> feature name (totals "00" and unclassified "99" excluded)
+SECTORS = {
+    "72": "accommodation_food",
+    "56": "admin_support",
+    "11": "agriculture",
+    "71": "arts_entertainment",
+    "23": "construction",
+    "61": "education",
+    "52": "finance",
+    "62": "healthcare",
+    "51": "information",
+    "55": "management",
+    "31": "manufacturing",
+    "21": "mining",
+    "81": "other_services",
+    "54": "professional_services",
+    "53": "real_estate",
+    "44": "retail",
+    "48": "transportation",
+    "22": "utilities",
+    "42": "wholesale",
+}
+SECTOR_NAMES = list(SECTORS.values())  # alphabetical: the column order of every output
+
+# Final regression table -> sector lags it carries. A single lag is named "{sector}_lag"
+FINAL_TABLES = {
+    "rent": ("regression_data_final_rent.csv", (1, 2)),
+    "population": ("regression_data_final_population.csv", (1, 2)),
+    "home_values": ("regression_data_final_home_values.csv", (1,)),
+}
+
+
+def cbp_files(data_dir: Path = DATA_DIR) -> dict[int, Path]:
+    """Available CBP extracts by year."""
+    files = {}
+    for path in data_dir.glob("census_business_patterns_*.csv"):
+        match = FILE_PATTERN.search(path.name)
+        if match:
+            files[int(match.group(1))] = path
+    return dict(sorted(files.items()))
+
+
+def read_cbp(path: Path) -> pd.DataFrame:
+    """One year's extract: NAME and SECTOR as categoricals, ESTAB as int32, sector rows only."""
+    df = pd.read_csv(
+        path,
+        usecols=["NAME", "SECTOR", "ESTAB"],
+        dtype={"NAME": "category", "SECTOR": "category", "ESTAB": "int32"},
+    )
+    return df[df["SECTOR"].isin(SECTORS)].reset_index(drop=True)
+
+
+def _signature(path: Path) -> dict:
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def load_years(files: dict[int, Path], cache_dir: Path | None = CACHE_DIR) -> dict[int, pd.DataFrame]:
+    """
+    Parsed extract per year. With a cache_dir, files whose size and mtime match the
+    manifest are read from the cached parquet; others are parsed and cached.
+    """
+    if cache_dir is None:
+        return {year: read_cbp(path) for year, path in files.items()}
+    manifest_path = cache_dir / CACHE_MANIFEST.name
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+    frames, changed = {}, False
+    for year, path in files.items():
+        cached = cache_dir / f"cbp_{year}.parquet"
+        signature = _signature(path)
+        if manifest.get(str(year)) == signature and cached.exists():
+            frames[year] = pd.read_parquet(cached)
+            continue
+        frames[year] = read_cbp(path)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        frames[year].to_parquet(cached, index=False)
+        manifest[str(year)] = signature
+        changed = True
+    if changed:
+        tmp_path = manifest_path.with_suffix(f".tmp{os.getpid()}")
+        tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+        os.replace(tmp_path, manifest_path)
+    return frames
+
+
+@dataclass
+class SectorPanel:
+    """ESTAB counts as a (places, sectors, years) array; NaN where a place-sector-year is absent."""
+
+    places: pd.Index
+    years: np.ndarray
+    estab: np.ndarray
+
+    @classmethod
+    def from_frames(cls, frames: dict[int, pd.DataFrame]) -> "SectorPanel":
+        years = np.array(sorted(frames))
+        places = pd.Index(sorted(set().union(*(f["NAME"].cat.categories for f in frames.values()))), name="NAME")
+        sector_index = pd.Index(list(SECTORS))
+        estab = np.full((len(places), len(SECTORS), len(years)), np.nan)
+        for t, year in enumerate(years):
+            df = frames[year]
+            rows = places.get_indexer(df["NAME"].cat.categories)[df["NAME"].cat.codes.to_numpy()]
+            cols = sector_index.get_indexer(df["SECTOR"].astype(str))
+            estab[rows, cols, t] = df["ESTAB"].to_numpy()
+        return cls(places, years, estab)
+
+    def growth(self) -> np.ndarray:
+        """YoY establishment growth, same shape as estab (NaN in the first year)."""
+        out = np.full_like(self.estab, np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[..., 1:] = self.estab[..., 1:] / self.estab[..., :-1] - 1
+        return out
+
+    def yoy_table(self) -> pd.DataFrame:
+        """
+        Long City/State/Year table of sector growth, ordered by year then place; rows
+        without any growth value dropped.
+        """
+        growth = self.growth()[..., 1:]
+        n_places, n_years = len(self.places), len(self.years) - 1
+        values = growth.transpose(0, 2, 1).reshape(n_places * n_years, len(SECTORS))
+        keep = ~np.isnan(values).all(axis=1)
+        city, state = split_place_name(pd.Series(self.places))
+        place = np.repeat(np.arange(n_places), n_years)[keep]
+        table = pd.DataFrame({
+            "City": city.to_numpy()[place],
+            "State": state.to_numpy()[place],
+            "Year": np.tile(self.years[1:], n_places)[keep],
+        })
+        table = pd.concat([table, pd.DataFrame(values[keep], columns=SECTOR_NAMES)], axis=1)
+        return table.sort_values(["Year", "City", "State"], kind="stable", ignore_index=True)
+
+
+def lag_columns(lags: tuple[int, ...]) -> dict[int, list[str]]:
+    """Feature names per lag, as in the regression tables."""
+    if len(lags) == 1:
+        return {lags[0]: [f"{s}_lag" for s in SECTOR_NAMES]}
+    return {lag: [f"{s}_lag{lag}" for s in SECTOR_NAMES] for lag in lags}
+
+
+def add_sector_lags(panel: pd.DataFrame, sectors: SectorPanel, lags: tuple[int, ...] = (1, 2)) -> pd.DataFrame:
+    """
+    Copy of a City/State/Year panel with lagged sector growth columns (growth in
+    Year - lag). Existing columns of the same name are replaced in place; growth that
+    is missing (place, sector or year not in the extracts) is 0.
+    """
+    out = panel.copy()
+    growth = sectors.growth()
+    rows = sectors.places.get_indexer(out["City"].astype(str) + ", " + out["State"].astype(str))
+    years = pd.Index(sectors.years)
+    for lag, columns in lag_columns(lags).items():
+        t = years.get_indexer(out["Year"].to_numpy() - lag)
+        found = (rows >= 0) & (t >= 0)
+        values = np.zeros((len(out), len(columns)))
+        values[found] = growth[rows[found], :, t[found]]
+        values[~np.isfinite(values)] = 0.0
+        out[columns] = values
+    return out
+
+
+def build_sector_panel(data_dir: Path = DATA_DIR, cache_dir: Path | None = CACHE_DIR) -> SectorPanel:
+    return SectorPanel.from_frames(load_years(cbp_files(data_dir), cache_dir))
+
+
+def rebuild(
+    data_dir: Path = DATA_DIR,
+    out_dir: Path = CACHE_DIR,
+    cache_dir: Path | None = CACHE_DIR,
+    verbose: bool = True,
+) -> dict[str, Path]:
+    """
+    Write the YoY table and refresh the sector columns of the final regression tables
+    found in data_dir. Outputs go to out_dir (default: data/cbp_cache; pass data_dir
+    to overwrite the inputs). Returns the written paths.
+    """
+    start = time.perf_counter()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    sectors = build_sector_panel(data_dir, cache_dir)
+    written = {}
+
+    yoy = sectors.yoy_table()
+    written["yoy"] = out_dir / YOY_FILE
+    yoy.to_csv(written["yoy"], index=False)
+
+    for name, (filename, lags) in FINAL_TABLES.items():
+        path = data_dir / filename
+        if not path.exists():
+            continue
+        table = add_sector_lags(pd.read_csv(path), sectors, lags)
+        written[name] = out_dir / filename
+        table.to_csv(written[name], index=False)
+    if verbose:
+        print(
+            f"CBP {sectors.years[0]}-{sectors.years[-1]}: {len(sectors.places)} places, "
+            f"{len(yoy)} YoY rows, {len(written) - 1} final tables ({time.perf_counter() - start:.2f}s)"
+        )
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build CBP sector growth features")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="Directory with the CBP extracts and final tables")
+    parser.add_argument("--out-dir", type=Path, default=CACHE_DIR, help="Output directory (default: data/cbp_cache; pass --data-dir's value to overwrite the tables)")
+    parser.add_argument("--no-cache", action="store_true", help="Parse every extract, ignoring data/cbp_cache")
+    args = parser.parse_args()
+    rebuild(args.data_dir, args.out_dir, None if args.no_cache else CACHE_DIR)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+City Betas
+
+Beta of each city's rent growth against its state market index, for every city at once.
+- Input: wide city frame with one rent column per year (regression_data/median_rent_by_place.csv)
+- Market index: per-state mean of city growth rates each year, or a weighted mean
+  (e.g. by population) via `weights`
+- All statistics are masked reductions over a (cities, years) array; cities with fewer
+  than MIN_OBS overlapping years get NaN
+
+Windows: window_betas() repeats the fit for rolling or expanding windows of years,
+one vectorized pass per window end.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .panel_builder import ID_COLS, wide_array
+
+MIN_OBS = 3
+BETA_COLUMNS = ["Beta", "R_Squared", "Market_Size", "City_Volatility", "State_Volatility", "Avg_Growth"]
+
+
+def growth_rates(rents: pd.DataFrame, years: list[int]) -> np.ndarray:
+    """(cities, years - 1) YoY growth in percent between consecutive year columns."""
+    levels = wide_array(rents, [str(y) for y in years])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (levels[:, 1:] - levels[:, :-1]) / levels[:, :-1] * 100
+
+
+def state_index(
+    growth: np.ndarray,
+    states: pd.Series,
+    weights: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Each city's market return series: the (weighted) mean growth of all cities in its
+    state, skipping missing values. `weights` is one weight per city or a
+    (cities, years) array. Returns a (cities, years) array aligned with growth.
+    """
+    codes, _ = pd.factorize(states)
+    valid = ~np.isnan(growth)
+    w = np.ones_like(growth) if weights is None else np.broadcast_to(
+        np.asarray(weights, dtype=float).reshape(len(growth), -1), growth.shape
+    )
+    w = np.where(valid & ~np.isnan(w), w, 0.0)
+    n_states = codes.max() + 1
+    totals = np.zeros((n_states, growth.shape[1]))
+    weight_sums = np.zeros_like(totals)
+    np.add.at(totals, codes, np.where(valid, growth, 0.0) * w)
+    np.add.at(weight_sums, codes, w)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        market = totals / weight_sums
+    # Cities without a state get no market
+    return np.where((codes >= 0)[:, None], market[codes], np.nan)
+
+
+def _nanstd(values: np.ndarray) -> np.ndarray:
+    """Population std over the last axis, NaN for rows with no data."""
+    valid = ~np.isnan(values)
+    n = valid.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(valid, values, 0.0).sum(axis=-1) / n
+        dev = np.where(valid, values - mean[..., None], 0.0)
+        return np.sqrt((dev**2).sum(axis=-1) / n)
+
+
+def batch_beta(city: np.ndarray, market: np.ndarray, min_obs: int = MIN_OBS) -> dict[str, np.ndarray]:
+    """
+    Beta, R² and volatility for each row of (cities, years) return arrays.
+    Beta = Cov(city, market) / Var(market) over the years both are observed (ddof=1);
+    R² is from the implied regression city = alpha + beta * market. Volatilities and
+    average growth use each series' own non-missing years.
+    """
+    mask = ~(np.isnan(city) | np.isnan(market))
+    n = mask.sum(axis=-1)
+    x = np.where(mask, market, 0.0)
+    y = np.where(mask, city, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mx = x.sum(axis=-1) / n
+        my = y.sum(axis=-1) / n
+        dx = np.where(mask, market - mx[..., None], 0.0)
+        dy = np.where(mask, city - my[..., None], 0.0)
+        cov = (dx * dy).sum(axis=-1) / (n - 1)
+        var = (dx**2).sum(axis=-1) / (n - 1)
+        beta = cov / var
+        alpha = my - beta * mx
+        resid = np.where(mask, city - (alpha[..., None] + beta[..., None] * market), 0.0)
+        ss_res = (resid**2).sum(axis=-1)
+        ss_tot = (dy**2).sum(axis=-1)
+        r_squared = np.where(ss_tot > 0, 1 - ss_res / ss_tot, 0.0)
+        avg_growth = np.nansum(city, axis=-1) / (~np.isnan(city)).sum(axis=-1)
+
+    undefined = (n < min_obs) | (var == 0)
+    return {
+        "Beta": np.where(undefined, np.nan, beta),
+        "R_Squared": np.where(undefined, np.nan, r_squared),
+        "City_Volatility": _nanstd(city),
+        "State_Volatility": _nanstd(market),
+        "Avg_Growth": avg_growth,
+    }
+
+
+def compute_city_betas(
+    rents: pd.DataFrame,
+    years: list[int],
+    weights: np.ndarray | None = None,
+    market: np.ndarray | None = None,
+    min_obs: int = MIN_OBS,
+) -> pd.DataFrame:
+    """
+    Betas of every city against its state index over all years.
+    `market` overrides the index with a (cities, years - 1) array of market returns.
+    Returns one row per city with a defined beta (the city_betas.csv layout).
+    """
+    growth = growth_rates(rents, years)
+    if market is None:
+        market = state_index(growth, rents["State"], weights)
+    stats = batch_beta(growth, market, min_obs)
+    result = rents[ID_COLS].reset_index(drop=True)
+    result["Market_Size"] = result["State"].map(result["State"].value_counts()).fillna(0).astype(int)
+    for name, values in stats.items():
+        result[name] = values
+    result = result[result["State"].notna()]
+    return result[ID_COLS + BETA_COLUMNS].dropna(subset=["Beta"]).reset_index(drop=True)
+
+
+def window_betas(
+    rents: pd.DataFrame,
+    years: list[int],
+    window: int | None = None,
+    weights: np.ndarray | None = None,
+    market: np.ndarray | None = None,
+    min_obs: int = MIN_OBS,
+) -> pd.DataFrame:
+    """
+    Betas over rolling windows of `window` growth years, or expanding windows from the
+    first year if window is None. Long format: one row per (city, window end year)
+    with a defined beta, End_Year being the last growth year in the window.
+    """
+    growth = growth_rates(rents, years)
+    if market is None:
+        market = state_index(growth, rents["State"], weights)
+    growth_years = years[1:]
+    ids = rents[ID_COLS].reset_index(drop=True)
+    market_size = ids["State"].map(ids["State"].value_counts()).fillna(0).astype(int).to_numpy()
+
+    frames = []
+    for end in range(min_obs, len(growth_years) + 1):
+        start = 0 if window is None else end - window
+        if start < 0:
+            continue
+        stats = batch_beta(growth[:, start:end], market[:, start:end], min_obs)
+        frame = ids.copy()
+        frame["Start_Year"] = growth_years[start]
+        frame["End_Year"] = growth_years[end - 1]
+        frame["Market_Size"] = market_size
+        for name, values in stats.items():
+            frame[name] = values
+        frames.append(frame[frame["Beta"].notna() & frame["State"].notna()])
+    columns = ID_COLS + ["Start_Year", "End_Year"] + BETA_COLUMNS
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True)[columns]
@@ -0,0 +1,179 @@
+"""
+Classical Baselines
+
+Per-city naive and classical forecasters, fitted for every city at once on a
+(cities, years) array, to compare against the panel models.
+- random_walk: last observed value; drift: last value plus the city's mean YoY change
+  (over consecutive observed years); ar: AR(p) with intercept on the city's own
+  history; exponential_smoothing: simple exponential smoothing with a per-city
+  smoothing weight picked from a grid by in-sample one-step SSE
+- Missing years are masked, not filled: they drop out of the difference means and the
+  AR regressions, and smoothing carries its level across them. A forecast made from
+  an older observation extends it by the number of skipped years
+- AR fits are stacked least squares: one (cities, p+1, p+1) batch of normal equations
+  solved together. Smoothing runs all cities and grid weights in one pass over the years
+- Every forecaster maps a (cities, t) history to the (cities,) forecast of year t;
+  NaN where a city has too little history
+
+forecast_panel() produces rolling-origin forecasts (each test year fitted on the
+years before it) in the City/State/Year layout of the ML panels; baseline_metrics()
+scores them per (model, test year) like Backtest, so summarize() applies to both.
+
+Usage:
+    forecasts = forecast_panel(rent, [str(y) for y in range(2009, 2024)], list(range(2009, 2024)), test_years=[2021, 2022, 2023])
+    metrics = baseline_metrics(forecasts)
+"""
+
+from collections.abc import Callable
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from .backtest import regression_metrics
+from .panel_builder import ID_COLS, stack_panel, wide_array
+
+SES_ALPHAS = np.linspace(0.05, 1.0, 20)
+
+
+def _last_observed(history: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(last observed value, years since it was observed + 1) per city; NaN / 0 without data."""
+    observed = ~np.isnan(history)
+    steps = np.argmax(observed[:, ::-1], axis=1) + 1
+    has_data = observed.any(axis=1)
+    last = np.where(has_data, history[np.arange(len(history)), history.shape[1] - steps], np.nan)
+    return last, np.where(has_data, steps, 0)
+
+
+def random_walk(history: np.ndarray) -> np.ndarray:
+    """Forecast = the last observed value."""
+    return _last_observed(history)[0]
+
+
+def drift(history: np.ndarray) -> np.ndarray:
+    """Random walk plus the mean change between consecutive observed years, per year ahead."""
+    last, steps = _last_observed(history)
+    changes = np.ma.masked_invalid(np.diff(history, axis=1))
+    mean_change = changes.mean(axis=1).filled(np.nan)
+    return last + mean_change * steps
+
+
+def ar(history: np.ndarray, p: int = 1, min_obs: int | None = None) -> np.ndarray:
+    """
+    AR(p) with intercept, least squares on each city's complete (y_t, y_t-1..y_t-p)
+    windows. Needs min_obs windows (default p + 2) and the last p years observed.
+    """
+    n_cities, n_years = history.shape
+    min_obs = p + 2 if min_obs is None else min_obs
+    if n_years <= p:
+        return np.full(n_cities, np.nan)
+    # Design (cities, windows, 1 + p): intercept, then lags 1..p; invalid windows zeroed
+    y = history[:, p:]
+    X = np.stack([np.ones_like(y)] + [history[:, p - k:n_years - k] for k in range(1, p + 1)], axis=-1)
+    valid = ~np.isnan(y) & ~np.isnan(X).any(axis=-1)
+    X = np.where(valid[..., None], X, 0.0)
+    y = np.where(valid, y, 0.0)
+
+    XtX = np.einsum("cwi,cwj->cij", X, X)
+    Xty = np.einsum("cwi,cw->ci", X, y)
+    coef = np.einsum("cij,cj->ci", np.linalg.pinv(XtX), Xty)
+
+    x_next = np.concatenate([np.ones((n_cities, 1)), history[:, ::-1][:, :p]], axis=1)
+    forecast = (coef * x_next).sum(axis=1)
+    forecast[valid.sum(axis=1) < min_obs] = np.nan
+    return forecast
+
+
+def exponential_smoothing(history: np.ndarray, alphas: np.ndarray | float = SES_ALPHAS) -> np.ndarray:
+    """
+    Simple exponential smoothing, level initialized at the first observation. With a
+    grid of alphas each city uses the one with the lowest one-step squared error.
+    """
+    alphas = np.atleast_1d(np.asarray(alphas, dtype=float))
+    n_cities = len(history)
+    level = np.full((n_cities, len(alphas)), np.nan)
+    sse = np.zeros((n_cities, len(alphas)))
+    for t in range(history.shape[1]):
+        y = history[:, t:t + 1]
+        observed = ~np.isnan(y)
+        started = observed & ~np.isnan(level)
+        error = np.where(started, y - level, 0.0)
+        sse += error ** 2
+        level = np.where(started, level + alphas * error, level)
+        level = np.where(observed & ~started, y, level)
+    best = np.argmin(sse, axis=1)
+    return level[np.arange(n_cities), best]
+
+
+METHODS: dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    "random_walk": random_walk,
+    "drift": drift,
+    "ar1": partial(ar, p=1),
+    "ar2": partial(ar, p=2),
+    "ses": exponential_smoothing,
+}
+
+
+def rolling_forecasts(
+    values: np.ndarray,
+    years: list[int],
+    test_years: list[int],
+    methods: dict[str, Callable] | None = None,
+    window: int | None = None,
+) -> dict[str, np.ndarray]:
+    """
+    (cities, len(test_years)) forecasts per method; each test year is forecast from the
+    years before it (all of them, or the last `window`).
+    """
+    methods = METHODS if methods is None else methods
+    years = list(years)
+    out = {name: np.full((len(values), len(test_years)), np.nan) for name in methods}
+    for j, year in enumerate(test_years):
+        t = years.index(year)
+        history = values[:, max(0, t - window) if window else 0:t]
+        if history.shape[1] == 0:
+            continue
+        for name, method in methods.items():
+            out[name][:, j] = method(history)
+    return out
+
+
+def forecast_panel(
+    df: pd.DataFrame,
+    columns: list[str],
+    years: list[int],
+    test_years: list[int],
+    methods: dict[str, Callable] | None = None,
+    window: int | None = None,
+    id_cols: list[str] = ID_COLS,
+) -> pd.DataFrame:
+    """
+    Long (City, State, Year) frame of the actual value `y` and one forecast column per
+    method, for every city-test year with an observed value. `columns` gives the
+    series' column in df for each entry of `years`.
+    """
+    test_years = [y for y in test_years if y in years]
+    values = wide_array(df, columns)
+    offset = [list(years).index(y) for y in test_years]
+    forecasts = rolling_forecasts(values, years, test_years, methods, window)
+    panel = stack_panel(df[id_cols], test_years, {"y": values[:, offset], **forecasts}, dropna=False)
+    return panel[panel["y"].notna()].reset_index(drop=True)
+
+
+def baseline_metrics(forecasts: pd.DataFrame, models: list[str] | None = None, common: bool = True) -> pd.DataFrame:
+    """
+    R², RMSE and MAE per (model, test year) from forecast_panel() output. With common,
+    every model is scored on the rows where all of them have a forecast.
+    """
+    models = [c for c in forecasts.columns if c not in ID_COLS + ["Year", "y"]] if models is None else models
+    rows = []
+    for year, group in forecasts.groupby("Year", sort=True):
+        available = group[models].notna()
+        shared = available.all(axis=1)
+        for name in models:
+            keep = shared if common else available[name]
+            row = {"model": name, "test_year": year, "n_test": int(keep.sum())}
+            if keep.any():
+                row.update(regression_metrics(group.loc[keep, "y"].to_numpy(), group.loc[keep, name].to_numpy()))
+            rows.append(row)
+    return pd.DataFrame(rows)
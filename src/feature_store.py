@@ -0,0 +1,156 @@
+"""
+Feature Store
+
+Writes a model-ready panel (target, lags, covariates, dummies) once to a memory-mapped
+float32 matrix that any number of experiments can open without parsing or copying.
+- Output: data/feature_store/{name}/
+  - values.f32: float32, column-major (one contiguous block per feature column)
+  - index.parquet: (City, State, Year) -> row offset
+  - meta.json: column names, row count, key columns
+- Reads are views on the OS page cache: processes opening the same store share memory
+- Every file is written to a temp name and swapped in with os.replace, meta.json last;
+  a reader that opens meta.json and values.f32 from different writes gets an error
+  instead of a mismatched matrix
+
+Usage:
+    write_feature_store(panel_df, "rent_yoy")
+    store = FeatureStore("rent_yoy")
+    X = store.numpy(["y_lag1", "pop_yoy", "home_yoy"])   # (rows, 3) view, no copy
+    y = store.torch("y")                                  # torch view on the same pages
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+STORE_DIR = Path("data/feature_store")
+KEY_COLS = ["City", "State", "Year"]
+DTYPE = np.float32
+
+
+def store_path(name: str) -> Path:
+    return STORE_DIR / name
+
+
+def write_feature_store(
+    df: pd.DataFrame,
+    name: str,
+    columns: list[str] | None = None,
+    key_cols: list[str] = KEY_COLS,
+) -> Path:
+    """
+    Write df's numeric columns (or `columns`) as a float32 column-major matrix plus a
+    key index. Rows keep df's order. Columns are written one at a time, so the only
+    extra memory is one float32 column.
+    """
+    if columns is None:
+        columns = [c for c in df.columns if c not in key_cols and pd.api.types.is_numeric_dtype(df[c])]
+    path = store_path(name)
+    path.mkdir(parents=True, exist_ok=True)
+    n_rows = len(df)
+
+    # Raw float32 (no .npy header) so the layout is fully described by meta.json
+    tmp_values = path / f"values.f32.tmp{os.getpid()}"
+    matrix = np.memmap(tmp_values, dtype=DTYPE, mode="w+", shape=(len(columns), n_rows))
+    for i, col in enumerate(columns):
+        matrix[i] = df[col].to_numpy(dtype=DTYPE, na_value=np.nan)
+    matrix.flush()
+    del matrix
+    os.replace(tmp_values, path / "values.f32")
+
+    index = df[key_cols].reset_index(drop=True)
+    index["row"] = np.arange(n_rows, dtype=np.int64)
+    tmp_index = path / f"index.parquet.tmp{os.getpid()}"
+    index.to_parquet(tmp_index, index=False)
+    os.replace(tmp_index, path / "index.parquet")
+
+    # meta.json goes last: it describes the files above
+    meta = {"columns": list(columns), "rows": n_rows, "key_cols": list(key_cols), "dtype": "float32"}
+    tmp_meta = path / f"meta.json.tmp{os.getpid()}"
+    tmp_meta.write_text(json.dumps(meta, indent=2))
+    os.replace(tmp_meta, path / "meta.json")
+    return path
+
+
+class FeatureStore:
+    """
+    Read-only view of a written feature store.
+    The matrix is mapped copy-on-write: views are writable (torch requires it) but
+    writes stay private to the process and never reach the file.
+    """
+
+    def __init__(self, name: str):
+        self.path = store_path(name)
+        meta = json.loads((self.path / "meta.json").read_text())
+        self.columns: list[str] = meta["columns"]
+        self.key_cols: list[str] = meta["key_cols"]
+        self.n_rows: int = meta["rows"]
+        self._col_index = {c: i for i, c in enumerate(self.columns)}
+        expected = len(self.columns) * self.n_rows * np.dtype(DTYPE).itemsize
+        if (self.path / "values.f32").stat().st_size != expected:
+            raise RuntimeError(f"Feature store {name!r} is being rewritten (values.f32 does not match meta.json); reopen it")
+        self.matrix = np.memmap(
+            self.path / "values.f32", dtype=DTYPE, mode="c", shape=(len(self.columns), self.n_rows)
+        )
+        self._index: pd.DataFrame | None = None
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    @property
+    def index(self) -> pd.DataFrame:
+        """Key columns and row offsets, loaded on first use."""
+        if self._index is None:
+            index = pd.read_parquet(self.path / "index.parquet")
+            if len(index) != self.n_rows:
+                raise RuntimeError(f"Feature store {self.path.name!r} was rewritten after it was opened; reopen it")
+            self._index = index
+        return self._index
+
+    def _positions(self, columns: str | list[str] | None) -> list[int]:
+        if columns is None:
+            return list(range(len(self.columns)))
+        if isinstance(columns, str):
+            columns = [columns]
+        missing = [c for c in columns if c not in self._col_index]
+        if missing:
+            raise KeyError(f"Columns not in feature store: {missing}")
+        return [self._col_index[c] for c in columns]
+
+    def numpy(self, columns: str | list[str] | None = None) -> np.ndarray:
+        """
+        A single column as a 1-D view, or columns as a (rows, k) array.
+        Columns stored next to each other in the requested order come back as a
+        zero-copy (strided) view; any other selection is gathered into a new array.
+        """
+        if isinstance(columns, str):
+            return self.matrix[self._col_index[columns]]
+        positions = self._positions(columns)
+        start = positions[0]
+        if positions == list(range(start, start + len(positions))):
+            return self.matrix[start:start + len(positions)].T
+        return self.matrix[positions].T
+
+    def torch(self, columns: str | list[str] | None = None):
+        """Same as numpy(), as a torch tensor sharing the memory."""
+        import torch
+
+        return torch.from_numpy(self.numpy(columns))
+
+    def rows(self, keys: pd.DataFrame | list[tuple]) -> np.ndarray:
+        """Row offsets for (City, State, Year) keys; -1 where a key is not in the store."""
+        if not isinstance(keys, pd.DataFrame):
+            keys = pd.DataFrame(list(keys), columns=self.key_cols)
+        lookup = pd.MultiIndex.from_frame(self.index[self.key_cols])
+        positions = lookup.get_indexer(pd.MultiIndex.from_frame(keys[self.key_cols]))
+        return np.where(positions >= 0, self.index["row"].to_numpy()[positions], -1)
+
+    def mask(self, **conditions) -> np.ndarray:
+        """Boolean row mask from key conditions, e.g. mask(Year=[2023]) or mask(State=["CA", "NY"])."""
+        mask = np.ones(self.n_rows, dtype=bool)
+        for col, values in conditions.items():
+            mask &= self.index[col].isin(values).to_numpy()
+        return mask
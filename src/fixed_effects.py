@@ -0,0 +1,150 @@
+"""
+Fixed Effects
+
+Absorbs state, year and city fixed effects by the within transformation instead of
+adding dummy columns, so memory and time stay flat as the number of groups grows.
+- Each effect is an integer code array over panel rows (factorized once)
+- One effect: subtract group means (exact, one pass)
+- Several effects: alternating projections, subtracting each effect's group means in
+  turn until the update is below `tol`
+- The estimated effects are kept per group, so held-out rows can be adjusted with the
+  training effects: y_hat = effect_y[g] + model.predict(X - effect_X[g])
+  (a group without training rows gets the training-weighted mean of the first effect,
+  which carries the constant, and 0 for later, centered effects)
+
+By Frisch-Waugh-Lovell, OLS on the within-transformed data gives the same slopes and
+predictions as OLS with the full set of dummies. Regularized models penalize the
+slopes only; the effects are unpenalized.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Panel columns identifying each effect; a city is a (City, State) pair
+EFFECTS = {
+    "state": [["State"]],
+    "year": [["Year"]],
+    "both": [["State"], ["Year"]],
+    "city": [["City", "State"]],
+    "city_year": [["City", "State"], ["Year"]],
+}
+TOL = 1e-10
+MAX_ITER = 1000
+
+
+def group_codes(panel: pd.DataFrame, fixed_effects: str) -> list[np.ndarray]:
+    """Integer group code per row for each effect in a fixed_effects setting."""
+    if fixed_effects not in EFFECTS:
+        raise ValueError(f"Unknown fixed_effects {fixed_effects!r}; expected one of {list(EFFECTS)}")
+    codes = []
+    for columns in EFFECTS[fixed_effects]:
+        if len(columns) == 1:
+            codes.append(pd.factorize(panel[columns[0]])[0])
+        else:
+            codes.append(panel.groupby(columns, sort=False, dropna=False).ngroup().to_numpy())
+    return codes
+
+
+def group_means(values: np.ndarray, codes: np.ndarray, n_groups: int) -> np.ndarray:
+    """(n_groups, k) column means of values by group; 0 for empty groups."""
+    counts = np.bincount(codes, minlength=n_groups)
+    sums = np.stack([np.bincount(codes, weights=values[:, j], minlength=n_groups) for j in range(values.shape[1])], axis=1)
+    return np.divide(sums, counts[:, None], out=np.zeros_like(sums), where=counts[:, None] > 0)
+
+
+def absorb(
+    values: np.ndarray,
+    codes: list[np.ndarray],
+    n_groups: list[int] | None = None,
+    tol: float = TOL,
+    max_iter: int = MAX_ITER,
+) -> tuple[np.ndarray, list[np.ndarray]]:
+    """
+    Remove fixed effects from the columns of values (rows, k).
+    Returns the within-transformed values and, per effect, the (n_groups, k) effects.
+    """
+    values = np.asarray(values, dtype=float)
+    squeeze = values.ndim == 1
+    resid = values.reshape(len(values), -1).copy()
+    if n_groups is None:
+        n_groups = [int(c.max()) + 1 if len(c) else 0 for c in codes]
+    effects = [np.zeros((n, resid.shape[1])) for n in n_groups]
+    scale = max(np.abs(resid).max(initial=0.0), 1.0)
+
+    for _ in range(1 if len(codes) == 1 else max_iter):
+        change = 0.0
+        for j, c in enumerate(codes):
+            means = group_means(resid, c, n_groups[j])
+            resid -= means[c]
+            effects[j] += means
+            change = max(change, np.abs(means).max(initial=0.0))
+        if change <= tol * scale:
+            break
+
+    # Center the later effects over the sample and move the constant into the first,
+    # so an unseen year (say) is predicted at the average year effect
+    for j in range(1, len(codes)):
+        center = effects[j][codes[j]].mean(axis=0)
+        effects[j] -= center
+        effects[0] += center
+
+    # Groups with no rows (e.g. a city first seen in the test year) keep the constant
+    # in the first effect and the average (0) in later ones
+    for j, c in enumerate(codes):
+        empty = np.bincount(c, minlength=n_groups[j]) == 0
+        effects[j][empty] = effects[0][codes[0]].mean(axis=0) if j == 0 else 0.0
+    return (resid[:, 0] if squeeze else resid), effects
+
+
+def effect_values(effects: list[np.ndarray], codes: list[np.ndarray], default: np.ndarray | None = None) -> np.ndarray:
+    """
+    Sum of the effects for each row's groups (rows, k). Codes beyond the fitted groups
+    contribute 0, or `default` for the first effect (its training-weighted mean).
+    """
+    total = 0.0
+    for j, (effect, c) in enumerate(zip(effects, codes)):
+        seen = c < len(effect)
+        fill = default if j == 0 and default is not None else 0.0
+        total = total + np.where(seen[:, None], effect[np.where(seen, c, 0)], fill)
+    return total
+
+
+class FixedEffectsModel:
+    """
+    Wraps an sklearn-style estimator with absorbed fixed effects, for use outside Backtest.
+    fit(X, y, codes) / predict(X, codes), with codes from group_codes() on the same
+    panel so train and test rows share group numbering. With codes=[] the estimator is
+    fitted on X as is.
+    """
+
+    def __init__(self, estimator, tol: float = TOL, max_iter: int = MAX_ITER):
+        self.estimator = estimator
+        self.tol = tol
+        self.max_iter = max_iter
+
+    def fit(self, X: np.ndarray, y: np.ndarray, codes: list[np.ndarray], n_groups: list[int] | None = None):
+        stacked = np.column_stack([X, y])
+        within, effects = absorb(stacked, codes, n_groups, self.tol, self.max_iter)
+        self.effects_ = effects
+        self.default_ = effects[0][codes[0]].mean(axis=0) if codes else None
+        self.estimator.fit(within[:, :-1], within[:, -1])
+        return self
+
+    def transform(self, X: np.ndarray, codes: list[np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+        """X adjusted by the training effects of each row's groups, and the effects to add back to y."""
+        if not self.effects_:
+            return X, np.zeros(len(X))
+        adjust = effect_values(self.effects_, codes, self.default_)
+        return X - adjust[:, :-1], adjust[:, -1]
+
+    def predict(self, X: np.ndarray, codes: list[np.ndarray]) -> np.ndarray:
+        X_within, offset = self.transform(X, codes)
+        return offset + self.estimator.predict(X_within)
+
+    def group_intercepts(self, coef: np.ndarray, intercept: float = 0.0) -> list[np.ndarray]:
+        """
+        Per effect, each group's shift of the prediction for a linear estimator with
+        slopes `coef` on the unscaled features (effect_y - effect_X @ coef); the first
+        effect also carries `intercept`. A row's prediction is X @ coef plus its groups' values.
+        """
+        return [e[:, -1] - e[:, :-1] @ coef + (intercept if j == 0 else 0.0) for j, e in enumerate(self.effects_)]
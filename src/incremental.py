@@ -0,0 +1,202 @@
+"""
+Incremental Fitting
+
+Fits that reuse work across backtest folds instead of starting from zero each time.
+- Ridge: per-year sufficient statistics (n, means, centered XᵀX and Xᵀy) are computed once;
+  an expanding fold adds one year's statistics to the previous fold's, a sliding fold
+  also subtracts the year that drops out. Standardizing and centering are done on
+  the statistics, and one eigendecomposition of the standardized Gram matrix gives
+  the exact ridge solution for every alpha in a grid
+- Other models: WarmStart keeps one estimator across folds and fits each fold from
+  the previous fold's solution (sklearn warm_start, or any model whose fit()
+  continues from its current weights)
+
+Ridge results match sklearn's StandardScaler + Ridge(alpha) per fold (plain Ridge when
+the Backtest has scale=False), so the grid replaces len(alphas) x len(folds) separate
+fits. alpha=0 gives the minimum-norm least-squares fit, as LinearRegression does.
+"""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .backtest import MIN_TEST, MIN_TRAIN, Backtest, regression_metrics, rolling_origin_folds
+
+
+@dataclass
+class GramStats:
+    """
+    Sufficient statistics of a linear regression sample: count, means and centered
+    cross-products. Samples are merged and removed with the pairwise update formulas,
+    which keep the cross-products accurate (no large raw sums cancelling).
+    """
+
+    n: int
+    mean_x: np.ndarray
+    mean_y: float
+    cxx: np.ndarray
+    cxy: np.ndarray
+
+    @classmethod
+    def from_arrays(cls, X: np.ndarray, y: np.ndarray) -> "GramStats":
+        mean_x, mean_y = X.mean(axis=0), float(y.mean())
+        Xc = X - mean_x
+        return cls(len(y), mean_x, mean_y, Xc.T @ Xc, Xc.T @ (y - mean_y))
+
+    def __add__(self, other: "GramStats") -> "GramStats":
+        n = self.n + other.n
+        dx = other.mean_x - self.mean_x
+        dy = other.mean_y - self.mean_y
+        w = self.n * other.n / n
+        return GramStats(
+            n,
+            self.mean_x + dx * other.n / n,
+            self.mean_y + dy * other.n / n,
+            self.cxx + other.cxx + w * np.outer(dx, dx),
+            self.cxy + other.cxy + w * dx * dy,
+        )
+
+    def __sub__(self, other: "GramStats") -> "GramStats":
+        n = self.n - other.n
+        mean_x = (self.n * self.mean_x - other.n * other.mean_x) / n
+        mean_y = (self.n * self.mean_y - other.n * other.mean_y) / n
+        dx = other.mean_x - mean_x
+        dy = other.mean_y - mean_y
+        w = n * other.n / self.n
+        return GramStats(
+            n,
+            mean_x,
+            mean_y,
+            self.cxx - other.cxx - w * np.outer(dx, dx),
+            self.cxy - other.cxy - w * dx * dy,
+        )
+
+
+class RidgePath:
+    """
+    Ridge fits for a grid of alphas from one set of statistics, equivalent to
+    StandardScaler followed by Ridge(alpha, fit_intercept=True), or Ridge alone with
+    scale=False. Directions with no variance get a zero coefficient at alpha=0.
+    """
+
+    def __init__(self, stats: GramStats, scale: bool = True):
+        n = stats.n
+        self.mean_x = stats.mean_x
+        self.mean_y = stats.mean_y
+        cxx = stats.cxx.copy()
+        cxy = stats.cxy.copy()
+        # StandardScaler: population std; columns constant up to rounding stay unscaled
+        eps = np.finfo(float).eps
+        var = np.clip(np.diag(cxx) / n, 0.0, None)
+        constant = var <= n * eps * var + (n * self.mean_x * eps) ** 2
+        cxx[constant, :] = 0.0
+        cxx[:, constant] = 0.0
+        cxy[constant] = 0.0
+        self.scale = np.where(constant | (not scale), 1.0, np.sqrt(var))
+        gram = cxx / np.outer(self.scale, self.scale)
+        self.eigvals, self.eigvecs = np.linalg.eigh((gram + gram.T) / 2)
+        self.proj = self.eigvecs.T @ (cxy / self.scale)
+
+    def coef(self, alphas: list[float]) -> np.ndarray:
+        """(n_features, len(alphas)) coefficients on the standardized (or, with scale=False, raw) features."""
+        alphas = np.asarray(alphas, dtype=float)
+        if (alphas < 0).any():
+            raise ValueError(f"alphas must be non-negative, got {alphas[alphas < 0].tolist()}")
+        # Eigenvalues at rounding level count as 0, so alpha=0 is the pseudo-inverse (lstsq) fit
+        denom = np.clip(self.eigvals, 0.0, None)[:, None] + alphas[None, :]
+        tol = len(self.eigvals) * np.finfo(float).eps * max(self.eigvals.max(initial=0.0), 1.0)
+        inverse = np.divide(1.0, denom, out=np.zeros_like(denom), where=denom > tol)
+        return self.eigvecs @ (self.proj[:, None] * inverse)
+
+    def predict(self, X: np.ndarray, alphas: list[float]) -> np.ndarray:
+        """(rows, len(alphas)) predictions for unscaled X."""
+        Z = (X - self.mean_x) / self.scale
+        return self.mean_y + Z @ self.coef(alphas)
+
+
+def year_stats(X: np.ndarray, y: np.ndarray, years: np.ndarray) -> dict[int, GramStats]:
+    """Statistics of each year's rows."""
+    return {int(year): GramStats.from_arrays(X[years == year], y[years == year]) for year in np.unique(years)}
+
+
+def ridge_backtest(
+    backtest: Backtest,
+    alphas: list[float],
+    test_years: list[int],
+    window: int | None = None,
+) -> pd.DataFrame:
+    """
+    Ridge over an alpha grid on every rolling-origin fold of a Backtest, in one pass.
+    Returns rows in Backtest.run()'s layout with an extra "alpha" column; the model
+    name is "ridge(alpha)". Features are standardized per fold when backtest.scale is
+    set, as in Backtest.run(). Fixed effects must be dummy columns (absorb=False): the
+    within transformation depends on the fold, so it can't be accumulated per year.
+    """
+    if backtest.absorb:
+        raise ValueError("ridge_backtest needs a Backtest with absorb=False")
+    X, y, years = backtest.X, backtest.y, backtest.years
+    per_year = year_stats(X, y, years)
+
+    rows = []
+    current: set[int] = set()
+    stats: GramStats | None = None
+    for fold in rolling_origin_folds(list(years), list(test_years), window):
+        train = set(fold.train_years)
+        # Update the running statistics with the years that enter and leave the window
+        for year in sorted(train - current):
+            stats = per_year[year] if stats is None else stats + per_year[year]
+        for year in sorted(current - train):
+            stats = stats - per_year[year]
+        current = train
+
+        test = years == fold.test_year
+        if stats.n < MIN_TRAIN or test.sum() < MIN_TEST:
+            continue
+        predictions = RidgePath(stats, backtest.scale).predict(X[test], alphas)
+        for j, alpha in enumerate(alphas):
+            rows.append({
+                "model": f"ridge({alpha:g})",
+                "alpha": alpha,
+                "test_year": fold.test_year,
+                "train_years": fold.label,
+                "n_train": stats.n,
+                "n_test": int(test.sum()),
+                **regression_metrics(y[test], predictions[:, j]),
+            })
+    return pd.DataFrame(rows)
+
+
+def select_alpha(metrics: pd.DataFrame, metric: str = "rmse") -> float:
+    """Alpha with the best mean metric across folds (lowest error, or highest r2)."""
+    means = metrics.groupby("alpha")[metric].mean()
+    return float(means.idxmax() if metric == "r2" else means.idxmin())
+
+
+class WarmStart:
+    """
+    Model factory that builds one model and returns it on every call, so each
+    Backtest fold starts from the previous fold's fit. sklearn estimators with a
+    warm_start parameter get it switched on; warm_params are set on the model for
+    every fold after the first (e.g. fewer epochs once the weights are trained).
+    Folds must run in order in one process (Backtest.run with workers=1); in a
+    process pool every fold gets a fresh copy.
+    """
+
+    def __init__(self, factory: Callable, warm_params: dict | None = None):
+        self.factory = factory
+        self.warm_params = warm_params or {}
+        self.model = None
+
+    def __call__(self):
+        if self.model is None:
+            self.model = self.factory()
+            if hasattr(self.model, "get_params") and "warm_start" in self.model.get_params():
+                self.model.set_params(warm_start=True)
+        elif self.warm_params:
+            self.model.set_params(**self.warm_params)
+        return self.model
+
+    def reset(self) -> None:
+        self.model = None
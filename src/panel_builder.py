@@ -0,0 +1,137 @@
+"""
+Panel Builder
+
+Turns a wide city frame (one row per city, one column per year and series, e.g.
+"2019_rent") into the long (City, State, Year) panels the models train on.
+- Each series is pulled into a (cities, years) float64 array once
+- Levels, log-levels, growth rates and lags are whole-array NumPy operations
+  (a lag is a shift along the year axis)
+- Rows with any missing feature are dropped with one mask; output rows are ordered
+  city by city, then by year, as the row-by-row builders in the notebooks produced
+
+build_level_growth_panel() reproduces the levels_vs_growth panel, build_lagged_panel()
+the YoY panel in baselines.ipynb.
+"""
+
+import numpy as np
+import pandas as pd
+
+ID_COLS = ["City", "State"]
+
+
+def wide_array(df: pd.DataFrame, columns: list[str]) -> np.ndarray:
+    """(rows, len(columns)) float64 array of the given columns; columns df lacks are all-NaN."""
+    out = np.full((len(df), len(columns)), np.nan)
+    for j, col in enumerate(columns):
+        if col in df.columns:
+            out[:, j] = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    return out
+
+
+def shift(values: np.ndarray, periods: int) -> np.ndarray:
+    """Lag a (cities, years) array by `periods` years, padding the first years with NaN."""
+    if periods == 0:
+        return values
+    out = np.full_like(values, np.nan)
+    out[:, periods:] = values[:, :-periods]
+    return out
+
+
+def safe_log(values: np.ndarray) -> np.ndarray:
+    """Natural log, NaN where the value is missing or not positive."""
+    out = np.full_like(values, np.nan)
+    positive = values > 0
+    out[positive] = np.log(values[positive])
+    return out
+
+
+def growth(values: np.ndarray, periods: int = 1) -> np.ndarray:
+    """Percent change over `periods` years, NaN where either value is missing or the base is not positive."""
+    prev = shift(values, periods)
+    out = np.full_like(values, np.nan)
+    valid = (prev > 0) & ~np.isnan(values)
+    out[valid] = (values[valid] - prev[valid]) / prev[valid] * 100
+    return out
+
+
+def lag_name(name: str, lag: int) -> str:
+    return name if lag == 0 else f"{name}_lag{lag}"
+
+
+def stack_panel(
+    ids: pd.DataFrame,
+    years: list[int],
+    features: dict[str, np.ndarray],
+    dropna: bool = True,
+) -> pd.DataFrame:
+    """
+    Stack (cities, years) feature arrays into a long frame: ids columns, Year, then
+    the features in dict order. Rows with any NaN feature are dropped when dropna.
+    """
+    arrays = list(features.values())
+    n_cities, n_years = len(ids), len(years)
+    if dropna and arrays:
+        keep = np.logical_and.reduce([~np.isnan(a) for a in arrays]).ravel()
+    else:
+        keep = np.ones(n_cities * n_years, dtype=bool)
+    flat = np.flatnonzero(keep)
+    city_idx, year_idx = np.divmod(flat, n_years)
+
+    panel = ids.iloc[city_idx].reset_index(drop=True)
+    panel["Year"] = np.asarray(years, dtype=np.int64)[year_idx]
+    for name, values in features.items():
+        panel[name] = values.reshape(-1)[flat]
+    return panel
+
+
+def build_level_growth_panel(
+    merged: pd.DataFrame,
+    years: list[int],
+    series: tuple[str, ...] = ("rent", "home", "pop"),
+    level_lags: int = 3,
+    growth_lags: int = 2,
+    id_cols: list[str] = ID_COLS,
+) -> pd.DataFrame:
+    """
+    Levels, log-levels and YoY growth rates (%) with lags for each series, from
+    "{year}_{series}" columns. Columns: levels for every series, then logs, then
+    growth rates, e.g. rent_level, rent_level_lag1, ..., pop_growth_lag2.
+    Only rows where every feature is available are kept.
+    """
+    # Year axis reaches back far enough for the deepest lag (growth needs one more year)
+    start = min(years) - max(level_lags, growth_lags + 1)
+    span = list(range(start, max(years) + 1))
+    offset = [span.index(y) for y in years]
+
+    levels, logs, growths = {}, {}, {}
+    for name in series:
+        values = wide_array(merged, [f"{y}_{name}" for y in span])
+        log_values = safe_log(values)
+        growth_values = growth(values)
+        for lag in range(level_lags + 1):
+            levels[lag_name(f"{name}_level", lag)] = shift(values, lag)[:, offset]
+            logs[lag_name(f"{name}_log", lag)] = shift(log_values, lag)[:, offset]
+        for lag in range(growth_lags + 1):
+            growths[lag_name(f"{name}_growth", lag)] = shift(growth_values, lag)[:, offset]
+
+    return stack_panel(merged[id_cols], years, {**levels, **logs, **growths})
+
+
+def build_lagged_panel(
+    merged: pd.DataFrame,
+    series: dict[str, list[str]],
+    years: list[int],
+    lags: int = 1,
+    id_cols: list[str] = ID_COLS,
+) -> pd.DataFrame:
+    """
+    Panel of each series and its lags. `series` maps an output name to that series'
+    columns, one per entry of `years` (consecutive periods). The first `lags` years
+    only serve as history. Columns: name, name_lag1, ... for each series in order.
+    """
+    features = {}
+    for name, columns in series.items():
+        values = wide_array(merged, columns)
+        for lag in range(lags + 1):
+            features[lag_name(name, lag)] = shift(values, lag)[:, lags:]
+    return stack_panel(merged[id_cols], years[lags:], features)
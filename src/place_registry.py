@@ -0,0 +1,333 @@
+"""
+Place Registry
+
+Canonical integer IDs for places (cities), so sources join on one int32 column instead
+of re-normalizing and merging City/State strings every time.
+- Sources: the regression_data city files (City, State columns) and the ACS aggregates
+  (place_fips, "Auburn city, Alabama" style names)
+- Names are matched on a normalized key: accents removed, case-folded, "Saint" -> "St",
+  punctuation and extra spaces dropped; Census legal suffixes ("city", "town",
+  "metro government (balance)", ...) are stripped from Census names only, so
+  "Carson City" stays intact. ALIASES maps the remaining known variants
+- Output: data/place_registry/places.parquet (place_id, City, State, state_fips,
+  place_fips, key) and aliases.parquet (source, City, State, place_fips, place_id),
+  the crosswalk from every source spelling and FIPS code to a place_id
+- IDs are stable: rebuilding keeps the existing IDs and appends new places
+- load_registry() reads the saved registry and rebuilds it only when a source file is
+  newer; load_source() keeps one row per place_id (a file that lists a place under
+  two spellings, e.g. Utqiagvik / Utqiaġvik, keeps its most complete row)
+
+Usage:
+    registry = load_registry()
+    rents = load_source("rent", registry)    # has a place_id column, unique per row
+    merged = homes.merge(rents.drop(columns=["City", "State"]), on="place_id", validate="one_to_one")
+"""
+
+import argparse
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from .acs_aggregation import AGG_DATA_DIR, YEARS
+
+REGISTRY_DIR = Path("data/place_registry")
+DATA_DIR = Path("regression_data")
+
+# Source name -> City/State file, in priority order for the canonical spelling.
+# Missing files are skipped when building.
+SOURCES = {
+    "master": DATA_DIR / "master_city_list.csv",
+    "zillow_home": DATA_DIR / "zillow_homeval_city.csv",
+    "zillow_rent": DATA_DIR / "zillow_rent_city.csv",
+    "home_values": DATA_DIR / "home_values_city.csv",
+    "rent": DATA_DIR / "median_rent_by_place.csv",
+    "pop": DATA_DIR / "city_population.csv",
+    "rca": DATA_DIR / "rca_cities.csv",
+    "rent_growth": DATA_DIR / "rent_growth_city.csv",
+}
+ACS_SOURCE = "acs"
+
+STATE_FIPS = {
+    "AL": "01", "AK": "02", "AZ": "04", "AR": "05", "CA": "06", "CO": "08", "CT": "09",
+    "DE": "10", "DC": "11", "FL": "12", "GA": "13", "HI": "15", "ID": "16", "IL": "17",
+    "IN": "18", "IA": "19", "KS": "20", "KY": "21", "LA": "22", "ME": "23", "MD": "24",
+    "MA": "25", "MI": "26", "MN": "27", "MS": "28", "MO": "29", "MT": "30", "NE": "31",
+    "NV": "32", "NH": "33", "NJ": "34", "NM": "35", "NY": "36", "NC": "37", "ND": "38",
+    "OH": "39", "OK": "40", "OR": "41", "PA": "42", "RI": "44", "SC": "45", "SD": "46",
+    "TN": "47", "TX": "48", "UT": "49", "VT": "50", "VA": "51", "WA": "53", "WV": "54",
+    "WI": "55", "WY": "56", "PR": "72",
+}
+STATE_NAMES = {
+    "Alabama": "AL", "Alaska": "AK", "Arizona": "AZ", "Arkansas": "AR", "California": "CA",
+    "Colorado": "CO", "Connecticut": "CT", "Delaware": "DE", "District of Columbia": "DC",
+    "Florida": "FL", "Georgia": "GA", "Hawaii": "HI", "Idaho": "ID", "Illinois": "IL",
+    "Indiana": "IN", "Iowa": "IA", "Kansas": "KS", "Kentucky": "KY", "Louisiana": "LA",
+    "Maine": "ME", "Maryland": "MD", "Massachusetts": "MA", "Michigan": "MI",
+    "Minnesota": "MN", "Mississippi": "MS", "Missouri": "MO", "Montana": "MT",
+    "Nebraska": "NE", "Nevada": "NV", "New Hampshire": "NH", "New Jersey": "NJ",
+    "New Mexico": "NM", "New York": "NY", "North Carolina": "NC", "North Dakota": "ND",
+    "Ohio": "OH", "Oklahoma": "OK", "Oregon": "OR", "Pennsylvania": "PA",
+    "Rhode Island": "RI", "South Carolina": "SC", "South Dakota": "SD", "Tennessee": "TN",
+    "Texas": "TX", "Utah": "UT", "Vermont": "VT", "Virginia": "VA", "Washington": "WA",
+    "West Virginia": "WV", "Wisconsin": "WI", "Wyoming": "WY", "Puerto Rico": "PR",
+}
+
+# Census legal/statistical area suffixes (lower case, so "Carson City" is kept)
+CENSUS_SUFFIX = (
+    r"\s+(?:city and borough|city \(balance\)|(?:unified|consolidated|metro|metropolitan) "
+    r"government \(balance\)|urban county|zona urbana|municipality|city|town|village|borough|CDP)$"
+)
+
+# (normalized key, state) -> normalized key of the same place in the other sources
+ALIASES = {
+    ("new york city", "NY"): "new york",
+    ("athens-clarke county", "GA"): "athens",
+    ("augusta-richmond county", "GA"): "augusta",
+    ("macon-bibb county", "GA"): "macon",
+    ("lexington-fayette", "KY"): "lexington",
+    ("louisville/jefferson county", "KY"): "louisville",
+    ("nashville-davidson", "TN"): "nashville",
+    ("urban honolulu", "HI"): "honolulu",
+    ("san buenaventura (ventura)", "CA"): "ventura",
+    ("boise city", "ID"): "boise",
+}
+
+
+def _normalize_one(name: str) -> str:
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    name = name.casefold().replace(".", "").replace("'", "")
+    name = " ".join(name.split())
+    if name.startswith("saint "):
+        name = "st " + name[6:]
+    elif name.startswith("sainte "):
+        name = "ste " + name[7:]
+    return name
+
+
+def normalize_city(cities: pd.Series, states: pd.Series, census: bool = False) -> pd.Series:
+    """
+    Normalized match key for each City (given its State abbreviation). Census names
+    (census=True) have their legal suffix stripped first. Work is done once per
+    distinct (City, State) pair.
+    """
+    frame = pd.DataFrame({"City": cities.astype("string").str.strip(), "State": states.astype("string").str.strip()})
+    uniq = frame.drop_duplicates()
+    codes = pd.MultiIndex.from_frame(uniq).get_indexer(pd.MultiIndex.from_frame(frame))
+    city = uniq["City"]
+    if census:
+        city = city.str.replace(CENSUS_SUFFIX, "", regex=True)
+    keys = [
+        pd.NA if pd.isna(c) else ALIASES.get((_normalize_one(c), s), _normalize_one(c))
+        for c, s in zip(city, uniq["State"])
+    ]
+    out = pd.array(keys, dtype="string").take(codes, allow_fill=True)
+    return pd.Series(out, index=cities.index, dtype="string")
+
+
+def split_place_name(names: pd.Series) -> tuple[pd.Series, pd.Series]:
+    """
+    Split "Name, State" strings into (City, State abbreviation). The state part can be
+    a full name ("Auburn city, Alabama") or an abbreviation ("Addis, LA").
+    """
+    parts = names.astype("string").str.rsplit(",", n=1, expand=True)
+    state = parts[1].str.strip()
+    state = state.map(lambda s: STATE_NAMES.get(s, s), na_action="ignore").astype("string")
+    return parts[0].str.strip(), state
+
+
+def read_city_file(path: Path) -> pd.DataFrame:
+    """A City/State csv with stripped header and key whitespace (some files are padded)."""
+    df = pd.read_csv(path, skipinitialspace=True)
+    df.columns = df.columns.str.strip()
+    df["City"] = df["City"].str.strip()
+    df["State"] = df["State"].str.strip()
+    return df
+
+
+def acs_places(years: list[int] | None = None) -> pd.DataFrame:
+    """Distinct ACS places (City, State, place_fips, year last seen), using each place's latest name."""
+    years = YEARS if years is None else years
+    frames = []
+    for year in years:
+        path = AGG_DATA_DIR / f"acs_{year}.parquet"
+        if path.exists():
+            frames.append(pq.read_table(path, columns=["place_fips", "place_name"]).to_pandas().assign(year=year))
+    if not frames:
+        return pd.DataFrame(columns=["City", "State", "place_fips", "year"])
+    ids = pd.concat(frames).sort_values("year").drop_duplicates("place_fips", keep="last")
+    city, state = split_place_name(ids["place_name"])
+    return pd.DataFrame({
+        "City": city.to_numpy(),
+        "State": state.to_numpy(),
+        "place_fips": ids["place_fips"].to_numpy(),
+        "year": ids["year"].to_numpy(),
+    })
+
+
+def _keys(df: pd.DataFrame) -> pd.MultiIndex:
+    return pd.MultiIndex.from_frame(df[["key", "State"]])
+
+
+@dataclass
+class PlaceRegistry:
+    places: pd.DataFrame
+    aliases: pd.DataFrame
+
+    @classmethod
+    def load(cls, directory: Path = REGISTRY_DIR) -> "PlaceRegistry":
+        return cls(pd.read_parquet(directory / "places.parquet"), pd.read_parquet(directory / "aliases.parquet"))
+
+    def save(self, directory: Path = REGISTRY_DIR) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        self.places.to_parquet(directory / "places.parquet", index=False)
+        self.aliases.to_parquet(directory / "aliases.parquet", index=False)
+
+    def _key_index(self) -> pd.Series:
+        return pd.Series(self.places["place_id"].to_numpy(), index=_keys(self.places))
+
+    def place_ids(self, cities: pd.Series, states: pd.Series, census: bool = False) -> pd.Series:
+        """place_id for each (City, State) pair; <NA> for places not in the registry."""
+        keys = normalize_city(cities, states, census)
+        lookup = pd.MultiIndex.from_arrays([keys, states.astype("string").str.strip()])
+        positions = self._key_index().index.get_indexer(lookup)
+        ids = pd.array(self.places["place_id"].to_numpy(), dtype="Int32").take(positions, allow_fill=True)
+        return pd.Series(ids, index=cities.index, name="place_id")
+
+    def attach(self, df: pd.DataFrame, city_col: str = "City", state_col: str = "State", census: bool = False) -> pd.DataFrame:
+        """Copy of df with a place_id column in front."""
+        ids = self.place_ids(df[city_col], df[state_col], census)
+        return df.assign(place_id=ids)[["place_id"] + [c for c in df.columns if c != "place_id"]]
+
+    def attach_fips(self, df: pd.DataFrame, fips_col: str = "place_fips") -> pd.DataFrame:
+        """Copy of df with a place_id column in front, looked up by 7-digit place FIPS."""
+        known = self.aliases.dropna(subset=["place_fips"]).drop_duplicates("place_fips")
+        positions = pd.Index(known["place_fips"]).get_indexer(df[fips_col].astype("string"))
+        ids = pd.array(known["place_id"].to_numpy(), dtype="Int32").take(positions, allow_fill=True)
+        return df.assign(place_id=ids)[["place_id"] + [c for c in df.columns if c != "place_id"]]
+
+
+def build_registry(
+    sources: dict[str, Path] | None = None,
+    acs_years: list[int] | None = None,
+    directory: Path | None = REGISTRY_DIR,
+    verbose: bool = True,
+) -> PlaceRegistry:
+    """
+    Build (or extend) the registry from every available source and save it to
+    `directory` (None to skip saving). Existing place IDs are kept.
+    """
+    sources = SOURCES if sources is None else sources
+    frames = []
+    for name, path in sources.items():
+        if not Path(path).exists():
+            if verbose:
+                print(f"  {name}: {path} not found, skipped")
+            continue
+        df = read_city_file(path)[["City", "State"]].drop_duplicates()
+        frames.append(df.assign(source=name, key=normalize_city(df["City"], df["State"])))
+    acs = acs_places(acs_years)
+    frames.append(acs.assign(source=ACS_SOURCE, key=normalize_city(acs["City"], acs["State"], census=True)))
+    seen = pd.concat(frames, ignore_index=True).dropna(subset=["City", "State", "key"])
+    seen["State"] = seen["State"].astype("string")
+    seen["City"] = seen["City"].astype("string")
+    seen["place_fips"] = seen["place_fips"].astype("string")
+    if verbose:
+        for name, count in seen.groupby("source", sort=False).size().items():
+            print(f"  {name}: {count} places")
+
+    # Canonical spelling: first source in priority order (ACS last, suffix stripped)
+    acs_rows = seen["source"] == ACS_SOURCE
+    city = seen["City"].mask(acs_rows, seen["City"].str.replace(CENSUS_SUFFIX, "", regex=True))
+    canonical = seen.assign(City=city).drop_duplicates(["key", "State"], keep="first")[["key", "State", "City"]]
+    # A place whose FIPS code changed (e.g. Macon after consolidation) keeps the latest
+    # one here; aliases keeps every code for FIPS lookups
+    fips = seen.loc[acs_rows].sort_values("year").drop_duplicates(["key", "State"], keep="last")
+    fips = fips[["key", "State", "place_fips"]]
+    places = canonical.merge(fips, on=["key", "State"], how="left")
+
+    # Stable IDs: keep the saved registry's IDs, names and FIPS codes (including places no
+    # source lists any more) and number new places after them
+    start = 0
+    places["place_id"] = pd.NA
+    if directory is not None and (directory / "places.parquet").exists():
+        previous = PlaceRegistry.load(directory).places
+        places = places.drop(columns="place_id").merge(
+            previous[["key", "State", "place_id", "City", "place_fips"]],
+            on=["key", "State"],
+            how="left",
+            suffixes=("", "_old"),
+        )
+        places["City"] = places.pop("City_old").fillna(places["City"])
+        places["place_fips"] = places["place_fips"].fillna(places.pop("place_fips_old"))
+        gone = ~_keys(previous).isin(_keys(places))
+        places = pd.concat([previous.loc[gone, places.columns], places], ignore_index=True)
+        start = int(previous["place_id"].max()) + 1 if len(previous) else 0
+    new = places["place_id"].isna()
+    order = places.loc[new].sort_values(["State", "key"]).index
+    places.loc[order, "place_id"] = range(start, start + len(order))
+    places["place_id"] = places["place_id"].astype("int32")
+    places["state_fips"] = places["State"].map(STATE_FIPS).astype("string")
+    places["place_fips"] = places["place_fips"].astype("string")
+    places = places.sort_values("place_id").reset_index(drop=True)[
+        ["place_id", "City", "State", "state_fips", "place_fips", "key"]
+    ]
+
+    aliases = seen[["source", "City", "State", "place_fips", "key"]]
+    aliases = aliases.merge(places[["key", "State", "place_id"]], on=["key", "State"])
+    aliases = aliases.drop(columns="key").drop_duplicates().reset_index(drop=True)
+    registry = PlaceRegistry(places, aliases)
+    if directory is not None:
+        registry.save(directory)
+    if verbose:
+        print(f"Registry: {len(places)} places ({int(new.sum())} new), {places['place_fips'].notna().sum()} with FIPS")
+    return registry
+
+
+def _source_files(sources: dict[str, Path]) -> list[Path]:
+    files = [Path(path) for path in sources.values()]
+    return [path for path in files + sorted(AGG_DATA_DIR.glob("acs_*.parquet")) if path.exists()]
+
+
+def load_registry(directory: Path = REGISTRY_DIR, sources: dict[str, Path] | None = None) -> PlaceRegistry:
+    """The saved registry, built first if it is missing or older than any source file."""
+    path = directory / "places.parquet"
+    if path.exists():
+        built = path.stat().st_mtime_ns
+        if all(f.stat().st_mtime_ns <= built for f in _source_files(SOURCES if sources is None else sources)):
+            return PlaceRegistry.load(directory)
+    return build_registry(sources, directory=directory, verbose=False)
+
+
+def load_source(name: str, registry: PlaceRegistry | None = None) -> pd.DataFrame:
+    """
+    Read a source file (SOURCES) with whitespace stripped and a place_id column attached.
+    Rows that resolve to the same place_id (one place under two spellings) are reduced
+    to the one with the most values.
+    """
+    registry = registry or load_registry()
+    df = registry.attach(read_city_file(SOURCES[name]))
+    ids = df["place_id"].loc[df.notna().sum(axis=1).sort_values(ascending=False, kind="stable").index]
+    duplicate = ids.duplicated() & ids.notna()
+    return df.drop(index=duplicate.index[duplicate]).reset_index(drop=True)
+
+
+def load_acs(year: int, registry: PlaceRegistry | None = None, columns: list[str] | None = None) -> pd.DataFrame:
+    """One year's ACS aggregate with a place_id column attached (by place FIPS)."""
+    registry = registry or load_registry()
+    if columns is not None and "place_fips" not in columns:
+        columns = ["place_fips"] + list(columns)
+    return registry.attach_fips(pd.read_parquet(AGG_DATA_DIR / f"acs_{year}.parquet", columns=columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the integer place registry")
+    parser.add_argument("--out", type=Path, default=REGISTRY_DIR, help="Registry directory")
+    args = parser.parse_args()
+    build_registry(directory=args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+RCA Transactions
+
+Parses the Real Capital Analytics deal export once into typed parquet files.
+- Input: regression_data/rca.csv (cp1252; prices like "108,250,000.00", dates like "Oct-25")
+- data/rca/transactions.parquet: one row per CSV row with snake_case columns, numbers
+  parsed (thousands separators dropped, "n/a" -> null), percentages as fractions
+  (cap_rate 0.043), `date` as the first of the month, low-cardinality text as
+  categoricals; rows sorted by City, State, date
+- Portfolio summary rows (no property_id, address "1 of N properties") are flagged
+  is_portfolio; their properties follow as their own rows
+- data/rca/city_periods_{month,year}.parquet: per (City, State, period) deal count,
+  units, priced properties, median price per unit and investment volume, over
+  property rows only
+- Partial-interest prices ("230,450,000.0  of 400,800,000.0") keep the share price in
+  `price` and the whole-property price in `price_full`
+
+The parquet files are rebuilt when the CSV is newer (ensure_built); loaders read
+them with column projection, so consumers never re-parse the CSV.
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RCA_CSV = Path("regression_data/rca.csv")
+RCA_DIR = Path("data/rca")
+ENCODING = "cp1252"
+KEY_COLS = ["City", "State"]
+FREQS = {"month": "M", "year": "Y"}
+
+# CSV column -> parquet column. City and State keep their names (the join keys of
+# every other source)
+RENAME = {
+    "Deal ID": "deal_id",
+    "Property ID": "property_id",
+    "Status": "status",
+    "Type": "type",
+    "Subtype": "subtype",
+    "Features": "features",
+    "Hotel Franchise": "hotel_franchise",
+    "Market": "market",
+    "Date": "date",
+    "Property Name": "property_name",
+    "Address": "address",
+    "City": "City",
+    "State": "State",
+    "Country": "country",
+    "Postal Code": "postal_code",
+    "Unit Count": "unit_count",
+    "sf": "sf",
+    "Yr Built": "year_built",
+    "Yr Renov": "year_renovated",
+    "Est Completion": "est_completion",
+    "# Bldgs": "buildings",
+    "# Floors": "floors",
+    "Land Area (acres)": "land_acres",
+    "Occupancy": "occupancy",
+    "Prop/Deal": "prop_of_deal",
+    "Price ($)": "price",
+    "Currency": "currency",
+    "$/Units": "price_per_unit",
+    "$/sf": "price_per_sf",
+    "$/MW": "price_per_mw",
+    "Price Qualifier": "price_qualifier",
+    "Partial Interest": "partial_interest",
+    "Partial Inv Vol ($)": "investment_volume",
+    "Cap Rate": "cap_rate",
+    "Cap Rate Qualifier": "cap_rate_qualifier",
+    "Owner/Buyer": "buyer",
+    "Buyer's Broker": "buyer_broker",
+    "Seller": "seller",
+    "Seller's Broker": "seller_broker",
+    "Lender": "lender",
+    "Comments or Notes": "comments",
+    "Latitude": "latitude",
+    "Longitude": "longitude",
+    "County": "county",
+    "Submarket": "submarket",
+    "MSA": "msa",
+    "CBSA": "cbsa",
+    "APN": "apn",
+    "Deed": "deed",
+    "Beds": "beds",
+    "Units": "unit_band",
+}
+NUMERIC = [
+    "unit_count", "sf", "buildings", "land_acres", "price_per_unit", "price_per_sf",
+    "price_per_mw", "investment_volume", "latitude", "longitude", "beds",
+]
+INTEGER = ["deal_id", "property_id", "year_built", "year_renovated"]
+PERCENT = ["occupancy", "cap_rate"]
+CATEGORICAL = [
+    "status", "type", "subtype", "features", "hotel_franchise", "market", "City", "State",
+    "country", "currency", "price_qualifier", "partial_interest", "cap_rate_qualifier",
+    "buyer_broker", "seller_broker", "county", "submarket", "msa", "cbsa", "unit_band",
+    "prop_of_deal", "est_completion", "floors",
+]
+
+
+def to_number(values: pd.Series) -> pd.Series:
+    """Numbers from strings with thousands separators (and a trailing %); others -> NaN."""
+    text = values.astype("string").str.replace(",", "", regex=False).str.strip().str.rstrip("%")
+    return pd.to_numeric(text, errors="coerce").astype("float64")
+
+
+def parse_price(values: pd.Series) -> tuple[pd.Series, pd.Series]:
+    """(price, price_full): a partial-interest "share of total" splits into both parts."""
+    parts = values.astype("string").str.split(" of ", n=1, expand=True, regex=False)
+    price = to_number(parts[0])
+    full = to_number(parts[1]) if parts.shape[1] > 1 else pd.Series(np.nan, index=values.index)
+    return price, full.fillna(price)
+
+
+def read_rca(path: Path = RCA_CSV) -> pd.DataFrame:
+    """Parse the RCA export into typed columns (see the module docstring)."""
+    raw = pd.read_csv(path, dtype=str, encoding=ENCODING, keep_default_na=False, na_values=["", "n/a"])
+    df = raw.rename(columns=RENAME)
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].str.strip()
+
+    df["date"] = pd.to_datetime(df["date"], format="%b-%y")
+    df["price"], df["price_full"] = parse_price(df["price"])
+    for col in NUMERIC:
+        df[col] = to_number(df[col])
+    for col in INTEGER:
+        # "Underway"/"Stalled" in Yr Built -> null
+        df[col] = to_number(df[col]).astype("Int64")
+    for col in PERCENT:
+        df[col] = to_number(df[col]) / 100.0
+    for col in CATEGORICAL:
+        df[col] = df[col].astype("category")
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].astype("string")
+    df["is_portfolio"] = df["property_id"].isna()
+
+    order = [RENAME[c] for c in raw.columns if c in RENAME]
+    order.insert(order.index("price") + 1, "price_full")
+    df = df[order + ["is_portfolio"]]
+    df = df.sort_values(KEY_COLS + ["date", "deal_id"], kind="stable", na_position="last")
+    return df.reset_index(drop=True)
+
+
+def city_period_aggregates(df: pd.DataFrame, freq: str = "month") -> pd.DataFrame:
+    """
+    Per (City, State, period): deals (distinct deal IDs), properties, units, priced
+    properties, median price per unit and investment volume (null when nothing was
+    priced), over property rows with a location. `period` is a pandas Period of the
+    given frequency ("month" or "year").
+    """
+    rows = df[~df["is_portfolio"] & df["City"].notna() & df["State"].notna()]
+    period = rows["date"].dt.to_period(FREQS[freq]).rename("period")
+    grouped = rows.groupby([rows["City"], rows["State"], period], observed=True, sort=True)
+    out = grouped.agg(
+        deals=("deal_id", "nunique"),
+        properties=("deal_id", "size"),
+        units=("unit_count", "sum"),
+        priced=("investment_volume", "count"),
+        median_price_per_unit=("price_per_unit", "median"),
+        volume=("investment_volume", "sum"),
+    )
+    out["volume"] = out["volume"].where(out["priced"] > 0)
+    return out
+
+
+def output_paths(out_dir: Path = RCA_DIR) -> dict[str, Path]:
+    paths = {"transactions": out_dir / "transactions.parquet"}
+    paths.update({freq: out_dir / f"city_periods_{freq}.parquet" for freq in FREQS})
+    return paths
+
+
+def build(path: Path = RCA_CSV, out_dir: Path = RCA_DIR, verbose: bool = True) -> dict[str, Path]:
+    """Parse the CSV and write the transaction and aggregate parquet files."""
+    start = time.perf_counter()
+    df = read_rca(path)
+    paths = output_paths(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(paths["transactions"], index=False)
+    for freq in FREQS:
+        aggregates = city_period_aggregates(df, freq).reset_index()
+        aggregates["period"] = aggregates["period"].dt.start_time
+        aggregates.to_parquet(paths[freq], index=False)
+    if verbose:
+        print(f"RCA: {len(df)} rows, {df['deal_id'].nunique()} deals -> {out_dir} ({time.perf_counter() - start:.2f}s)")
+    return paths
+
+
+def ensure_built(path: Path = RCA_CSV, out_dir: Path = RCA_DIR) -> dict[str, Path]:
+    """Rebuild the parquet files if any is missing or older than the CSV."""
+    paths = output_paths(out_dir)
+    source_mtime = path.stat().st_mtime_ns
+    if all(p.exists() and p.stat().st_mtime_ns >= source_mtime for p in paths.values()):
+        return paths
+    return build(path, out_dir, verbose=False)
+
+
+def load_transactions(columns: list[str] | None = None, out_dir: Path = RCA_DIR) -> pd.DataFrame:
+    """Typed transactions, reading only `columns` if given."""
+    return pd.read_parquet(ensure_built(out_dir=out_dir)["transactions"], columns=columns)
+
+
+def load_city_periods(freq: str = "month", out_dir: Path = RCA_DIR) -> pd.DataFrame:
+    """City-period aggregates indexed by (City, State, period)."""
+    df = pd.read_parquet(ensure_built(out_dir=out_dir)[freq])
+    df["period"] = df["period"].dt.to_period(FREQS[freq])
+    return df.set_index(["City", "State", "period"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse the RCA export into typed parquet files")
+    parser.add_argument("--csv", type=Path, default=RCA_CSV, help="RCA export")
+    parser.add_argument("--out", type=Path, default=RCA_DIR, help="Output directory")
+    args = parser.parse_args()
+    build(args.csv, args.out)
+
+
+if __name__ == "__main__":
+    main()
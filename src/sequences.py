@@ -0,0 +1,142 @@
+"""
+Sequence Datasets
+
+Sliding-window samples for the LSTM models, built from a (cities, years, features)
+tensor without materializing the windows.
+- city_tensor() stacks each series' year columns into one float32 tensor;
+  zscore_by_city() gives the per-city normalized levels of the hybrid model
+- Windows are a numpy sliding_window_view over the year axis (no copy); a sample is a
+  (city, target year) pair whose seq_length history steps and target are all present.
+  Missing years simply make the windows that touch them invalid
+- Normalization statistics are computed from the training windows (each city-year
+  weighted by how many windows contain it, the same as fitting StandardScaler on the
+  flattened windows) and applied per batch
+- SequenceDataset is a torch Dataset: single items for a DataLoader, or batch(indices)
+  to gather a whole batch with one fancy-indexing call
+
+Samples are ordered city by city, then by target year, as the notebook loops built them.
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+import torch
+from numpy.lib.stride_tricks import sliding_window_view
+from torch.utils.data import Dataset
+
+from .panel_builder import wide_array
+
+
+def city_tensor(df: pd.DataFrame, series: list[list[str]]) -> np.ndarray:
+    """(cities, years, features) float32 tensor; series[i] lists feature i's column per year."""
+    return np.stack([wide_array(df, columns) for columns in series], axis=-1).astype(np.float32)
+
+
+def zscore_by_city(values: np.ndarray, eps: float = 1e-8) -> np.ndarray:
+    """Standardize each city's series over its own non-missing years (cities, years)."""
+    with warnings.catch_warnings():
+        # Cities with no data at all stay NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean = np.nanmean(values, axis=1, keepdims=True)
+        std = np.nanstd(values, axis=1, keepdims=True)
+    return (values - mean) / (std + eps)
+
+
+def valid_windows(tensor: np.ndarray, seq_length: int, target_feature: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (city, target year index) of every window whose history (all features, seq_length
+    steps) and target value are present, in city-then-year order.
+    """
+    complete = ~np.isnan(tensor).any(axis=-1)
+    history_ok = sliding_window_view(complete, seq_length, axis=1).all(axis=-1)[:, :-1]
+    target_ok = ~np.isnan(tensor[:, seq_length:, target_feature])
+    city, offset = np.nonzero(history_ok & target_ok)
+    return city, offset + seq_length
+
+
+def window_moments(tensor: np.ndarray, city: np.ndarray, target: np.ndarray, seq_length: int) -> tuple[np.ndarray, np.ndarray]:
+    """Per-feature mean and std (population) over all time steps of the given windows."""
+    weights = np.zeros(tensor.shape[:2])
+    for k in range(1, seq_length + 1):
+        np.add.at(weights, (city, target - k), 1.0)
+    used = weights > 0
+    values = tensor[used].astype(np.float64)
+    w = weights[used][:, None]
+    mean = (w * values).sum(axis=0) / w.sum()
+    var = (w * (values - mean) ** 2).sum(axis=0) / w.sum()
+    std = np.sqrt(var)
+    std[std == 0] = 1.0
+    return mean, std
+
+
+class SequenceDataset(Dataset):
+    """
+    Lazy sliding-window dataset over a (cities, years, features) tensor.
+    Item i is (x, y): x the normalized (seq_length, features) history, y the
+    (1,)-shaped target one step after it. `rows` restricts the samples (e.g. to a
+    train or test mask over valid_windows order).
+    """
+
+    def __init__(
+        self,
+        tensor: np.ndarray,
+        seq_length: int,
+        target_feature: int = 0,
+        rows: np.ndarray | None = None,
+        mean: np.ndarray | None = None,
+        std: np.ndarray | None = None,
+    ):
+        self.tensor = np.ascontiguousarray(tensor, dtype=np.float32)
+        self.seq_length = seq_length
+        self.target_feature = target_feature
+        self.windows = sliding_window_view(self.tensor, seq_length, axis=1)  # (cities, starts, features, seq)
+        city, target = valid_windows(self.tensor, seq_length, target_feature)
+        self.rows = np.arange(len(city)) if rows is None else np.asarray(rows)
+        self.city, self.target = city[self.rows], target[self.rows]
+        if mean is None or std is None:
+            mean, std = window_moments(self.tensor, self.city, self.target, seq_length)
+        self.mean = torch.as_tensor(mean, dtype=torch.float32)
+        self.std = torch.as_tensor(std, dtype=torch.float32)
+
+    def __len__(self) -> int:
+        return len(self.city)
+
+    def __getitem__(self, i: int) -> tuple[torch.Tensor, torch.Tensor]:
+        c, t = self.city[i], self.target[i]
+        x = torch.from_numpy(self.windows[c, t - self.seq_length].T.copy())
+        y = torch.tensor([self.tensor[c, t, self.target_feature]])
+        return (x - self.mean) / self.std, y
+
+    def batch(self, indices: np.ndarray | slice | None = None) -> tuple[torch.Tensor, torch.Tensor]:
+        """A batch of samples as (batch, seq_length, features) and (batch, 1) tensors."""
+        indices = slice(None) if indices is None else indices
+        c, t = self.city[indices], self.target[indices]
+        x = torch.from_numpy(self.windows[c, t - self.seq_length].transpose(0, 2, 1))
+        y = torch.from_numpy(self.tensor[c, t, self.target_feature]).unsqueeze(1)
+        return (x - self.mean) / self.std, y
+
+    def targets(self) -> np.ndarray:
+        """Target value of each sample, without building the windows."""
+        return self.tensor[self.city, self.target, self.target_feature]
+
+    def __getitems__(self, indices: list[int]) -> list[tuple[torch.Tensor, torch.Tensor]]:
+        # DataLoader fetches a whole batch in one call when a dataset defines this
+        x, y = self.batch(np.asarray(indices))
+        return list(zip(x, y))
+
+    def split(self, mask: np.ndarray) -> tuple["SequenceDataset", "SequenceDataset"]:
+        """
+        (train, test) datasets for a boolean mask over this dataset's samples (True =
+        test). Both are normalized with statistics from the training windows.
+        """
+        train_rows = np.flatnonzero(~mask)
+        mean, std = window_moments(self.tensor, self.city[train_rows], self.target[train_rows], self.seq_length)
+        args = (self.tensor, self.seq_length, self.target_feature)
+        train = SequenceDataset(*args, rows=self.rows[train_rows], mean=mean, std=std)
+        test = SequenceDataset(*args, rows=self.rows[np.flatnonzero(mask)], mean=mean, std=std)
+        return train, test
+
+    def target_years(self, years: list[int]) -> np.ndarray:
+        """Calendar year of each sample's target, given the tensor's year labels."""
+        return np.asarray(years)[self.target]
@@ -0,0 +1,284 @@
+"""
+Trainer
+
+CPU training loop for the forecasting networks (ForecastingFCNN, ForecastingLSTM).
+- Data stays in two tensors; batches are index slices of a per-epoch permutation
+  (no DataLoader, no per-sample collation). batch_size=None trains on the full tensor
+- A dataset with batch(indices) (e.g. SequenceDataset) is not materialized: each
+  training batch, and validation/prediction in chunks, is drawn from it by index
+- Batch losses are summed on-device; the epoch loss is read once per logged epoch,
+  and the loss history is converted once at the end
+- Validation every `val_every` epochs with early stopping after `patience` epochs
+  without improvement; the best weights are cloned (not aliased) and restored at the
+  end, and optionally saved to `checkpoint_path`
+- Optional torch.set_num_threads and torch.compile / TorchScript of the forward pass
+
+TorchRegressor wraps a module factory with sklearn-style fit/predict so networks can
+run in Backtest and WarmStart (with warm_start=True, fit continues from the current weights).
+"""
+
+import copy
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+
+import numpy as np
+import torch
+from torch import nn
+
+
+@dataclass
+class TrainConfig:
+    learning_rate: float = 5e-4
+    epochs: int = 300
+    batch_size: int | None = 32
+    patience: int = 30
+    val_every: int = 1
+    weight_decay: float = 0.0
+    num_threads: int | None = None
+    compile: str | None = None  # "compile" (torch.compile) or "script" (TorchScript)
+    checkpoint_path: Path | str | None = None
+    log_every: int | None = 20
+    seed: int | None = None
+
+    @classmethod
+    def from_dict(cls, config: dict, **overrides) -> "TrainConfig":
+        """From a notebook config dict (NN_CONFIG, LSTM_CONFIG, ...); unrelated keys are ignored."""
+        names = {f.name for f in fields(cls)}
+        values = {k: v for k, v in config.items() if k in names}
+        if "early_stopping_patience" in config:
+            values["patience"] = config["early_stopping_patience"]
+        return cls(**{**values, **overrides})
+
+
+@dataclass
+class TrainResult:
+    train_losses: list[float] = field(default_factory=list)
+    val_losses: list[float] = field(default_factory=list)
+    best_val_loss: float = float("inf")
+    best_epoch: int = 0
+    epochs_run: int = 0
+    seconds: float = 0.0
+
+
+EVAL_BATCH_SIZE = 4096  # Chunk size for validation and prediction on a lazy dataset
+
+
+def _lazy(X, y=None) -> bool:
+    """A dataset with batch(indices) and no separate targets: batches are drawn from it."""
+    return hasattr(X, "batch") and y is None
+
+
+class _RowSubset:
+    """Some rows of a dataset with batch(indices), itself drawn from the same way."""
+
+    def __init__(self, dataset, rows: np.ndarray):
+        self.dataset = dataset
+        self.rows = np.asarray(rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def batch(self, indices: np.ndarray | slice | None = None) -> tuple[torch.Tensor, torch.Tensor]:
+        return self.dataset.batch(self.rows if indices is None else self.rows[indices])
+
+
+def _as_tensors(X, y=None) -> tuple[torch.Tensor, torch.Tensor | None]:
+    """Accept tensors, arrays, or a dataset with batch() (e.g. SequenceDataset), materialized."""
+    if hasattr(X, "batch") and y is None:
+        X, y = X.batch()
+    X = torch.as_tensor(X, dtype=torch.float32)
+    if y is not None:
+        y = torch.as_tensor(y, dtype=torch.float32)
+        if y.ndim == 1:
+            y = y.unsqueeze(1)
+    return X, y
+
+
+def _chunked_loss(forward: Callable, criterion: nn.Module, dataset, batch_size: int) -> float:
+    """Mean loss over a lazy dataset, a chunk at a time."""
+    total = 0.0
+    for lo in range(0, len(dataset), batch_size):
+        X, y = dataset.batch(slice(lo, lo + batch_size))
+        total += criterion(forward(X), y).item() * len(y)
+    return total / len(dataset)
+
+
+def _forward_fn(model: nn.Module, mode: str | None) -> Callable:
+    if mode == "compile":
+        return torch.compile(model)
+    if mode == "script":
+        return torch.jit.script(model)
+    return model
+
+
+def train_model(
+    model: nn.Module,
+    X_train,
+    y_train=None,
+    X_val=None,
+    y_val=None,
+    config: TrainConfig | None = None,
+    optimizer: torch.optim.Optimizer | None = None,
+) -> TrainResult:
+    """
+    Train with Adam and MSE loss from the model's current weights. Without validation
+    data every epoch runs and the final weights are kept. X_train / X_val may be
+    datasets with batch(indices) (y None), drawn from a batch at a time.
+    """
+    config = config or TrainConfig()
+    if config.num_threads:
+        torch.set_num_threads(config.num_threads)
+    if config.seed is not None:
+        torch.manual_seed(config.seed)
+    n = len(X_train)
+    batch_size = n if not config.batch_size else min(config.batch_size, n)
+    # A lazy dataset is only materialized for full-batch training
+    lazy = _lazy(X_train, y_train) and batch_size < n
+    if not lazy:
+        X_train, y_train = _as_tensors(X_train, y_train)
+    has_val = X_val is not None
+    lazy_val = has_val and _lazy(X_val, y_val)
+    if has_val and not lazy_val:
+        X_val, y_val = _as_tensors(X_val, y_val)
+
+    forward = _forward_fn(model, config.compile)
+    optimizer = optimizer or torch.optim.Adam(
+        model.parameters(), lr=config.learning_rate, weight_decay=config.weight_decay
+    )
+    criterion = nn.MSELoss()
+
+    result = TrainResult()
+    epoch_losses: list[torch.Tensor] = []
+    best_state = None
+    since_best = 0
+    start = time.perf_counter()
+    for epoch in range(config.epochs):
+        forward.train()
+        total = torch.zeros(())
+        order = torch.randperm(n) if batch_size < n else None
+        for lo in range(0, n, batch_size):
+            if order is None:
+                X_batch, y_batch = X_train, y_train
+            else:
+                idx = order[lo:lo + batch_size]
+                X_batch, y_batch = X_train.batch(idx.numpy()) if lazy else (X_train[idx], y_train[idx])
+            optimizer.zero_grad(set_to_none=True)
+            loss = criterion(forward(X_batch), y_batch)
+            loss.backward()
+            optimizer.step()
+            total += loss.detach() * len(y_batch)
+        epoch_losses.append(total / n)
+        result.epochs_run = epoch + 1
+
+        if has_val and (epoch + 1) % config.val_every == 0:
+            forward.eval()
+            with torch.no_grad():
+                if lazy_val:
+                    val_loss = _chunked_loss(forward, criterion, X_val, EVAL_BATCH_SIZE)
+                else:
+                    val_loss = criterion(forward(X_val), y_val).item()
+            result.val_losses.append(val_loss)
+            if val_loss < result.best_val_loss:
+                result.best_val_loss = val_loss
+                result.best_epoch = epoch + 1
+                best_state = copy.deepcopy(model.state_dict())
+                since_best = 0
+            else:
+                since_best += config.val_every
+            if since_best >= config.patience:
+                print(f"Early stopping at epoch {epoch + 1}")
+                break
+
+        if config.log_every and (epoch + 1) % config.log_every == 0:
+            message = f"Epoch {epoch + 1}/{config.epochs}: Train Loss = {epoch_losses[-1].item():.6f}"
+            if has_val and result.val_losses:
+                message += f", Val Loss = {result.val_losses[-1]:.6f}"
+            print(message)
+
+    result.train_losses = torch.stack(epoch_losses).tolist() if epoch_losses else []
+    if best_state is not None:
+        model.load_state_dict(best_state)
+    if config.checkpoint_path is not None:
+        path = Path(config.checkpoint_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        torch.save({"state_dict": model.state_dict(), "best_epoch": result.best_epoch,
+                    "best_val_loss": result.best_val_loss}, path)
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def predict(model: nn.Module, X, batch_size: int | None = None) -> np.ndarray:
+    """Predictions as a flat array, in eval mode without autograd. A lazy dataset is predicted in chunks."""
+    model.eval()
+    if _lazy(X):
+        batch_size = batch_size or EVAL_BATCH_SIZE
+        with torch.inference_mode():
+            return torch.cat([
+                model(X.batch(slice(lo, lo + batch_size))[0]) for lo in range(0, len(X), batch_size)
+            ]).reshape(-1).numpy()
+    X, _ = _as_tensors(X)
+    with torch.inference_mode():
+        if not batch_size:
+            return model(X).reshape(-1).numpy()
+        return torch.cat([model(X[lo:lo + batch_size]) for lo in range(0, len(X), batch_size)]).reshape(-1).numpy()
+
+
+class TorchRegressor:
+    """
+    sklearn-style wrapper: fit(X, y) builds the module with module_factory(n_features)
+    and trains it; predict(X) returns a flat array. validation_fraction holds out the
+    last rows for early stopping. With warm_start=True a second fit() continues from
+    the trained weights. X may be a dataset with batch(indices) (y None), which is
+    trained on without materializing it.
+    """
+
+    def __init__(
+        self,
+        module_factory: Callable[[int], nn.Module],
+        config: TrainConfig | None = None,
+        validation_fraction: float = 0.0,
+        warm_start: bool = False,
+    ):
+        self.module_factory = module_factory
+        self.config = config or TrainConfig(log_every=None)
+        self.validation_fraction = validation_fraction
+        self.warm_start = warm_start
+        self.model_: nn.Module | None = None
+
+    def get_params(self, deep: bool = True) -> dict:
+        return {
+            "module_factory": self.module_factory,
+            "config": self.config,
+            "validation_fraction": self.validation_fraction,
+            "warm_start": self.warm_start,
+        }
+
+    def set_params(self, **params) -> "TorchRegressor":
+        for name, value in params.items():
+            setattr(self, name, value)
+        return self
+
+    def fit(self, X, y) -> "TorchRegressor":
+        lazy = _lazy(X, y)
+        if lazy:
+            n_features = X.batch(slice(0, 1))[0].shape[-1]
+        else:
+            X, y = _as_tensors(X, y)
+            n_features = X.shape[-1]
+        if self.model_ is None or not self.warm_start:
+            self.model_ = self.module_factory(n_features)
+        n_val = int(len(X) * self.validation_fraction)
+        if n_val and lazy:
+            n_train = len(X) - n_val
+            train, val = _RowSubset(X, np.arange(n_train)), _RowSubset(X, np.arange(n_train, len(X)))
+            self.history_ = train_model(self.model_, train, X_val=val, config=self.config)
+        elif n_val:
+            self.history_ = train_model(self.model_, X[:-n_val], y[:-n_val], X[-n_val:], y[-n_val:], self.config)
+        else:
+            self.history_ = train_model(self.model_, X, y, config=self.config)
+        return self
+
+    def predict(self, X) -> np.ndarray:
+        return predict(self.model_, X)
@@ -0,0 +1,164 @@
+"""
+Regression tests for src/panel_builder.py against reference copies of the row-by-row
+(iterrows) builders it replaced in levels_vs_growth.ipynb and baselines.ipynb.
+
+Usage:
+    python -m pytest tests/test_panel_builder.py
+    python -m unittest tests.test_panel_builder
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.panel_builder import build_lagged_panel, build_level_growth_panel
+
+SERIES = ("rent", "home", "pop")
+
+
+def wide_frame(seed: int = 0, n_cities: int = 40, years: range = range(2010, 2025)) -> pd.DataFrame:
+    """Synthetic wide frame with "{year}_{series}" columns, NaN gaps and zero values."""
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        "City": [f"City {i}" for i in range(n_cities)],
+        "State": [f"S{i % 7}" for i in range(n_cities)],
+    })
+    for year in years:
+        for name in SERIES:
+            values = rng.lognormal(7, 1, n_cities)
+            values[rng.random(n_cities) < 0.08] = np.nan
+            values[rng.random(n_cities) < 0.04] = 0.0
+            frame[f"{year}_{name}"] = values
+    # One city with no data at all, one with a whole series missing for a year
+    frame.loc[0, frame.columns[2:]] = np.nan
+    frame.loc[1, [f"2018_{name}" for name in SERIES]] = np.nan
+    return frame
+
+
+def reference_level_growth_panel(merged: pd.DataFrame, yoy_years: list[int]) -> pd.DataFrame:
+    """The levels_vs_growth.ipynb loop (3 level lags, 2 growth lags) before build_level_growth_panel."""
+    panel_data = []
+
+    def safe_growth(curr, prev):
+        if pd.isna(curr) or pd.isna(prev) or prev <= 0:
+            return np.nan
+        return (curr - prev) / prev * 100
+
+    def safe_log(val):
+        if pd.isna(val) or val <= 0:
+            return np.nan
+        return np.log(val)
+
+    for idx, row in merged.iterrows():
+        for year in yoy_years:
+            values = {
+                name: [row.get(f"{year - lag}_{name}", np.nan) for lag in range(4)]
+                for name in SERIES
+            }
+            current = [v for name in SERIES for v in values[name][:2]]
+            if any(pd.isna(current)):
+                continue
+            if any(v <= 0 for v in current):
+                continue
+
+            record = {"City": row["City"], "State": row["State"], "Year": year}
+            for name in SERIES:
+                for lag in range(4):
+                    record[f"{name}_level" + (f"_lag{lag}" if lag else "")] = values[name][lag]
+            for name in SERIES:
+                for lag in range(4):
+                    record[f"{name}_log" + (f"_lag{lag}" if lag else "")] = safe_log(values[name][lag])
+            for name in SERIES:
+                for lag in range(3):
+                    record[f"{name}_growth" + (f"_lag{lag}" if lag else "")] = safe_growth(
+                        values[name][lag], values[name][lag + 1]
+                    )
+            panel_data.append(record)
+
+    panel_df = pd.DataFrame(panel_data)
+    key_cols = [c for c in panel_df.columns if "level" in c or "log" in c or "growth" in c]
+    return panel_df.dropna(subset=key_cols)
+
+
+def reference_lagged_panel(merged, outcome_cols, cov1_cols, cov2_cols, yoy_years, cov1_name, cov2_name):
+    """The baselines.ipynb loop (one lag) before build_lagged_panel."""
+    panel_data = []
+    for idx, row in merged.iterrows():
+        y_values = row[outcome_cols].values.astype(float)
+        cov1_values = row[cov1_cols].values.astype(float)
+        cov2_values = row[cov2_cols].values.astype(float)
+
+        for t in range(1, len(yoy_years)):
+            y_t, y_lag1 = y_values[t], y_values[t - 1]
+            cov1_t, cov1_lag1 = cov1_values[t], cov1_values[t - 1]
+            cov2_t, cov2_lag1 = cov2_values[t], cov2_values[t - 1]
+            if pd.isna([y_t, y_lag1, cov1_t, cov1_lag1, cov2_t, cov2_lag1]).any():
+                continue
+            panel_data.append({
+                "City": row["City"],
+                "State": row["State"],
+                "Year": yoy_years[t],
+                "y": y_t,
+                "y_lag1": y_lag1,
+                cov1_name: cov1_t,
+                f"{cov1_name}_lag1": cov1_lag1,
+                cov2_name: cov2_t,
+                f"{cov2_name}_lag1": cov2_lag1,
+            })
+    return pd.DataFrame(panel_data)
+
+
+class LevelGrowthPanelTest(unittest.TestCase):
+    def test_matches_reference_loop(self):
+        merged = wide_frame()
+        years = list(range(2013, 2025))
+        expected = reference_level_growth_panel(merged, years).reset_index(drop=True)
+        actual = build_level_growth_panel(merged, years)
+        self.assertGreater(len(expected), 0)
+        pd.testing.assert_frame_equal(actual, expected, check_exact=False, rtol=1e-12)
+
+    def test_zero_level_drops_row(self):
+        merged = wide_frame(seed=1)
+        merged.loc[2, "2015_home"] = 0.0
+        panel = build_level_growth_panel(merged, list(range(2013, 2025)))
+        city = panel[panel["City"] == "City 2"]
+        # 2015 has a zero current level, 2016-2018 carry it as a lag (log and/or growth undefined)
+        self.assertFalse(city["Year"].isin([2015, 2016, 2017, 2018]).any())
+
+    def test_years_before_data_are_missing(self):
+        # The first years lack lags (no columns before 2010), so they produce no rows
+        merged = wide_frame(seed=2)
+        expected = reference_level_growth_panel(merged, list(range(2010, 2016))).reset_index(drop=True)
+        actual = build_level_growth_panel(merged, list(range(2010, 2016)))
+        pd.testing.assert_frame_equal(actual, expected, check_exact=False, rtol=1e-12)
+        self.assertTrue((actual["Year"] >= 2013).all())
+
+
+class LaggedPanelTest(unittest.TestCase):
+    def test_matches_reference_loop(self):
+        # YoY columns as in baselines.ipynb, with gaps; zeros are valid growth rates here
+        merged = wide_frame(seed=3)
+        yoy_years = list(range(2011, 2025))
+        for name in SERIES:
+            for year in yoy_years:
+                prev, curr = merged[f"{year - 1}_{name}"], merged[f"{year}_{name}"]
+                merged[f"{year}_{name}_yoy"] = ((curr - prev) / prev * 100).where(prev > 0)
+            merged.loc[3, f"2016_{name}_yoy"] = 0.0
+        outcome_cols = [f"{y}_rent_yoy" for y in yoy_years]
+        cov1_cols = [f"{y}_pop_yoy" for y in yoy_years]
+        cov2_cols = [f"{y}_home_yoy" for y in yoy_years]
+
+        expected = reference_lagged_panel(
+            merged, outcome_cols, cov1_cols, cov2_cols, yoy_years, "pop_yoy", "home_yoy"
+        )
+        actual = build_lagged_panel(
+            merged, {"y": outcome_cols, "pop_yoy": cov1_cols, "home_yoy": cov2_cols}, yoy_years, lags=1
+        )
+        self.assertGreater(len(expected), 0)
+        self.assertIn(2016, actual.loc[actual["City"] == "City 3", "Year"].tolist())
+        pd.testing.assert_frame_equal(actual, expected, check_exact=False, rtol=1e-12)
+
+
+if __name__ == "__main__":
+    unittest.main()